@@ -0,0 +1,94 @@
+"""
+Benchmarks for the multiagent project.  Run one of them by name:
+
+> python benchmarks.py successors
+
+Every benchmark prints a plain-text table, one row per measurement.
+"""
+
+import sys
+import time
+
+import exploration
+import layout
+import pacman
+
+
+def loadGameState(layoutName, numGhosts=None):
+    "Returns the starting GameState of a layout in layouts/, with up to numGhosts ghosts (all by default)."
+    lay = layout.getLayout(layoutName)
+    if lay == None: raise Exception('The layout ' + layoutName + ' cannot be found')
+    if numGhosts == None: numGhosts = lay.getNumGhosts()
+    gameState = pacman.GameState()
+    gameState.initialize(lay, numGhosts)
+    return gameState
+
+def printTable(header, rows):
+    "Prints rows of values as left-aligned columns."
+    rows = [[str(value) for value in row] for row in [header] + rows]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    for row in rows:
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+
+##############
+# Successors #
+##############
+
+def expandTree(gameState, depth):
+    """
+    Generates every successor of gameState down to depth plies (one move of
+    one agent each, agents in turn, as minimax does) and returns how many
+    successors were generated.
+    """
+    numAgents = gameState.getNumAgents()
+    count = 0
+    level = [gameState]
+    for ply in range(depth):
+        agentIndex = ply % numAgents
+        nextLevel = []
+        for state in level:
+            if state.isWin() or state.isLose(): continue
+            for action in state.getLegalActions(agentIndex):
+                nextLevel.append(state.generateSuccessor(agentIndex, action))
+        count += len(nextLevel)
+        level = nextLevel
+    return count
+
+def benchmarkSuccessors(layouts=('minimaxClassic', 'smallClassic', 'mediumClassic', 'originalClassic'),
+                        rounds=2, seconds=1.0, trackers=('off', 'counter', 'exact', 'hll')):
+    """
+    Successors per second of GameState.generateSuccessor: the full game
+    tree of each layout, every agent moving rounds times, is expanded over
+    and over for about seconds seconds, with each exploration tracker.  The
+    states column is the last tree's count from the tracker.
+    """
+    rows = []
+    for name in layouts:
+        for mode in trackers:
+            gameState = loadGameState(name)
+            depth = rounds * gameState.getNumAgents()
+            count = 0
+            start = time.perf_counter()
+            while True:
+                tracker = exploration.makeTracker(mode)
+                gameState.explorationTracker = tracker
+                count += expandTree(gameState, depth)
+                elapsed = time.perf_counter() - start
+                if elapsed >= seconds: break
+            states = tracker.count() if tracker != None else '-'
+            rows.append([name, gameState.getNumAgents(), depth, mode, states, count,
+                         '%.2f' % elapsed, '%.0f' % (count / elapsed)])
+    printTable(['layout', 'agents', 'plies', 'tracker', 'states', 'successors', 'seconds', 'successors/s'], rows)
+
+BENCHMARKS = {
+    'successors': benchmarkSuccessors,
+}
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or sorted(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise Exception('Unknown benchmark %s; choose from %s' % (name, ', '.join(sorted(BENCHMARKS))))
+        print('### %s ###' % name)
+        BENCHMARKS[name]()
@@ -0,0 +1,174 @@
+"""
+Distance fields: the maze distance from every cell of a layout to the
+nearest of a set of sources (food, capsules, ghosts, Pacman...).
+
+A field is built with one multi-source breadth-first search, after which
+"how far to the nearest X" from any cell is a lookup:
+
+  field = distanceFields.foodField(gameState)
+  field.distance(gameState.getPacmanPosition())
+
+With NumPy installed the walls are turned into a boolean array once per
+layout and the search advances a whole frontier at a time with array
+operations.  Without NumPy the same fields are computed by a plain Python
+breadth-first search, so the module works in every project either way.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from util import nearestPoint
+
+# Distance of cells no source can reach
+UNREACHABLE = -1
+
+
+class DistanceField:
+    """
+    The maze distance from each cell of a walls Grid to its nearest source.
+
+    distances[x][y] is the distance of cell (x, y), or UNREACHABLE for walls
+    and for cells cut off from every source.
+    """
+
+    def __init__(self, walls, sources):
+        self.width, self.height = walls.width, walls.height
+        sources = [nearestPoint(source) for source in sources]
+        sources = [(x, y) for x, y in sources if 0 <= x < self.width and 0 <= y < self.height and not walls[x][y]]
+        if numpy != None:
+            self.distances = _numpyField(_openCells(walls), sources)
+        else:
+            self.distances = _pythonField(walls, sources)
+
+    def distance(self, position):
+        """
+        Returns the maze distance from position to the nearest source, or None
+        if no source can be reached.  Positions between cells are rounded.
+        """
+        x, y = nearestPoint(position)
+        distance = int(self.distances[x][y])
+        if distance == UNREACHABLE: return None
+        return distance
+
+    def __getitem__(self, position):
+        return self.distance(position)
+
+
+def distanceField(walls, sources):
+    "Returns the DistanceField of a walls Grid from a list of source positions."
+    return DistanceField(walls, sources)
+
+def foodField(gameState):
+    "Returns the distance field to the nearest food of a game state."
+    return _cachedField('food', gameState.getWalls(), gameState.getFood())
+
+def capsuleField(gameState):
+    "Returns the distance field to the nearest capsule of a game state."
+    return distanceField(gameState.getWalls(), gameState.getCapsules())
+
+def ghostField(gameState, scared=None):
+    """
+    Returns the distance field to the nearest ghost of a game state; only to
+    scared ghosts if scared is True, or only to brave ones if it is False.
+    """
+    ghosts = [ghost.getPosition() for ghost in gameState.getGhostStates()
+              if scared == None or (ghost.scaredTimer > 0) == scared]
+    return distanceField(gameState.getWalls(), ghosts)
+
+def gridField(walls, grid):
+    "Returns the distance field to the true cells of a Grid, such as a food Grid."
+    return _cachedField('grid', walls, grid)
+
+def positionField(walls, position):
+    """
+    Returns the distance field to a single position.  Fields are kept for
+    every position asked about while the walls stay the same, so an agent
+    chasing Pacman around one layout builds each field only once.
+    """
+    global _positionFields
+    lastWalls, fields = _positionFields
+    if lastWalls is not walls:
+        fields = {}
+        _positionFields = (walls, fields)
+    position = nearestPoint(position)
+    if position not in fields:
+        fields[position] = distanceField(walls, [position])
+    return fields[position]
+
+
+# The last field built from a Grid of sources, by kind.  Evaluating several
+# actions from one state asks for the same field repeatedly
+_lastFields = {}
+
+def _cachedField(kind, walls, grid):
+    if kind in _lastFields:
+        lastWalls, lastGrid, field = _lastFields[kind]
+        if lastWalls is walls and (lastGrid is grid or lastGrid == grid):
+            return field
+    field = distanceField(walls, grid.asList())
+    _lastFields[kind] = (walls, grid.copy(), field)
+    return field
+
+
+# The fields to single positions, for the last walls Grid seen
+_positionFields = (None, {})
+
+# The boolean array of open cells for the last walls Grid seen
+_lastOpen = (None, None)
+
+def _openCells(walls):
+    "Returns a (width, height) boolean array, true where there is no wall."
+    global _lastOpen
+    lastWalls, cells = _lastOpen
+    if lastWalls is not walls:
+        cells = ~numpy.array(walls.data, dtype=bool)
+        _lastOpen = (walls, cells)
+    return cells
+
+def _numpyField(cells, sources):
+    "Multi-source BFS one frontier at a time, with array shifts."
+    distances = numpy.full(cells.shape, UNREACHABLE, dtype=numpy.int32)
+    frontier = numpy.zeros(cells.shape, dtype=bool)
+    for x, y in sources:
+        frontier[x, y] = True
+    distances[frontier] = 0
+    unvisited = cells & ~frontier
+
+    depth = 0
+    while frontier.any():
+        depth += 1
+        reached = numpy.zeros(cells.shape, dtype=bool)
+        reached[1:, :] |= frontier[:-1, :]
+        reached[:-1, :] |= frontier[1:, :]
+        reached[:, 1:] |= frontier[:, :-1]
+        reached[:, :-1] |= frontier[:, 1:]
+        reached &= unvisited
+        distances[reached] = depth
+        unvisited &= ~reached
+        frontier = reached
+    return distances
+
+def _pythonField(walls, sources):
+    "Multi-source BFS one frontier at a time, over lists."
+    width, height = walls.width, walls.height
+    distances = [[UNREACHABLE] * height for _ in range(width)]
+    frontier = []
+    for x, y in sources:
+        if distances[x][y] == UNREACHABLE:
+            distances[x][y] = 0
+            frontier.append((x, y))
+
+    depth = 0
+    while frontier:
+        depth += 1
+        nextFrontier = []
+        for x, y in frontier:
+            for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if 0 <= nx < width and 0 <= ny < height and not walls[nx][ny] \
+                   and distances[nx][ny] == UNREACHABLE:
+                    distances[nx][ny] = depth
+                    nextFrontier.append((nx, ny))
+        frontier = nextFrontier
+    return distances
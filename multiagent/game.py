@@ -22,6 +22,8 @@
 
 from util import *
 import time, os
+import hashlib
+import struct
 import traceback
 import sys
 
@@ -74,7 +76,11 @@ class Configuration:
 
     The convention for positions, like a graph, is that (0,0) is the lower left corner, x increases
     horizontally and y increases vertically.  Therefore, north is the direction of increasing y, or (0,1).
+
+    Configurations are shared between game states, so they are never changed
+    in place: a move makes a new one.
     """
+    __slots__ = ('pos', 'direction')
 
     def __init__(self, pos, direction):
         self.pos = pos
@@ -120,7 +126,11 @@ class Configuration:
 class AgentState:
     """
     AgentStates hold the state of an agent (configuration, speed, scared, etc).
+
+    A successor game state shares the AgentStates of its predecessor, except
+    for those the move changes; see GameStateData.writableAgentState.
     """
+    __slots__ = ('start', 'configuration', 'isPacman', 'scaredTimer', 'numCarrying', 'numReturned')
 
     def __init__( self, startConfiguration, isPacman ):
         self.start = startConfiguration
@@ -145,7 +155,9 @@ class AgentState:
         return hash(hash(self.configuration) + 13 * hash(self.scaredTimer))
 
     def copy( self ):
-        state = AgentState( self.start, self.isPacman )
+        state = AgentState.__new__( AgentState )
+        state.start = self.start
+        state.isPacman = self.isPacman
         state.configuration = self.configuration
         state.scaredTimer = self.scaredTimer
         state.numCarrying = self.numCarrying
@@ -161,92 +173,116 @@ class AgentState:
 
 class Grid:
     """
-    A 2-dimensional array of objects backed by a list of lists.  Data is accessed
-    via grid[x][y] where (x,y) are positions on a Pacman map with x horizontal,
-    y vertical and the origin (0,0) in the bottom left corner.
+    A 2-dimensional array of booleans backed by the bits of a single int.  Data
+    is accessed via grid[x][y] where (x,y) are positions on a Pacman map with x
+    horizontal, y vertical and the origin (0,0) in the bottom left corner.
+
+    Cell (x,y) is bit x * height + y of self.bits, so copying, hashing,
+    comparing and counting a grid work on a few machine words rather than
+    every cell.  grid[x] is a lightweight view of column x, which can be
+    read, written and iterated like the lists grids used to be made of.
 
     The __str__ method constructs an output that is oriented like a pacman board.
     """
+    CELLS_PER_INT = 30
+
     def __init__(self, width, height, initialValue=False, bitRepresentation=None):
         if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
-        self.CELLS_PER_INT = 30
 
         self.width = width
         self.height = height
-        self.data = [[initialValue for y in range(height)] for x in range(width)]
+        self.bits = (1 << (width * height)) - 1 if initialValue else 0
+        self._columns = None
         if bitRepresentation:
             self._unpackBits(bitRepresentation)
 
     def __getitem__(self, i):
-        return self.data[i]
+        # Column views are made as they are first asked for, then kept
+        columns = self._columns
+        if columns is None: columns = self._columns = [None] * self.width
+        column = columns[i]
+        if column is None: column = columns[i] = GridColumn(self, i % self.width)
+        return column
 
     def __setitem__(self, key, item):
-        self.data[key] = item
+        column = self[key]
+        for y, value in enumerate(item):
+            column[y] = value
+
+    def __iter__(self):
+        for x in range(self.width):
+            yield self[x]
+
+    def __len__(self):
+        return self.width
+
+    @property
+    def data(self):
+        "The grid as a list of columns, each a list of booleans.  Changing it leaves the grid as it is."
+        return [list(column) for column in self]
 
     def __str__(self):
-        out = [[str(self.data[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
 
     def __eq__(self, other):
-        if other == None: return False
-        return self.data == other.data
+        if not isinstance(other, Grid): return False
+        return self.bits == other.bits and self.width == other.width and self.height == other.height
 
     def __hash__(self):
-        # return hash(str(self))
-        base = 1
-        h = 0
-        for l in self.data:
-            for i in l:
-                if i:
-                    h += base
-                base *= 2
-        return hash(h)
+        # The same as hashing the sum of 2 ** i over the true cells, i counted column by column
+        return hash(self.bits)
+
+    def __getstate__(self):
+        return (self.width, self.height, self.bits)
+
+    def __setstate__(self, state):
+        self.width, self.height, self.bits = state
+        self._columns = None
 
     def copy(self):
-        g = Grid(self.width, self.height)
-        g.data = [x[:] for x in self.data]
+        g = Grid.__new__(Grid)
+        g.width, g.height, g.bits = self.width, self.height, self.bits
+        g._columns = None
         return g
 
     def deepCopy(self):
         return self.copy()
 
     def shallowCopy(self):
-        g = Grid(self.width, self.height)
-        g.data = self.data
-        return g
+        return self.copy()
 
     def count(self, item =True ):
-        return sum([x.count(item) for x in self.data])
+        trueCells = bin(self.bits).count('1')
+        if item: return trueCells
+        return self.width * self.height - trueCells
 
     def asList(self, key = True):
-        list = []
-        for x in range(self.width):
-            for y in range(self.height):
-                if self[x][y] == key: list.append( (x,y) )
-        return list
+        cells = self._cellDigits()
+        digit = '1' if key else '0'
+        return [position for position, cell in zip(_cellPositions(self.width, self.height), cells) if cell == digit]
 
     def packBits(self):
         """
         Returns an efficient int list representation
 
         (width, height, bitPackedInts...)
+
+        Each int holds CELLS_PER_INT cells, counted column by column, with
+        the first cell in the highest bit.
         """
-        bits = [self.width, self.height]
-        currentInt = 0
-        for i in range(self.height * self.width):
-            bit = self.CELLS_PER_INT - (i % self.CELLS_PER_INT) - 1
-            x, y = self._cellIndexToPosition(i)
-            if self[x][y]:
-                currentInt += 2 ** bit
-            if (i + 1) % self.CELLS_PER_INT == 0:
-                bits.append(currentInt)
-                currentInt = 0
-        bits.append(currentInt)
-        return tuple(bits)
+        cells = self._cellDigits()
+        cells += '0' * (self.CELLS_PER_INT - len(cells) % self.CELLS_PER_INT)
+        return (self.width, self.height) + tuple(int(cells[i:i + self.CELLS_PER_INT], 2)
+                                                 for i in range(0, len(cells), self.CELLS_PER_INT))
+
+    def _cellDigits(self):
+        "Returns the cells as a string of binary digits, cell 0 first."
+        return format(self.bits, '0%db' % (self.width * self.height))[::-1]
 
     def _cellIndexToPosition(self, index):
-        x = index / self.height
+        x = index // self.height
         y = index % self.height
         return x, y
 
@@ -254,25 +290,62 @@ class Grid:
         """
         Fills in data from a bit-level representation
         """
-        cell = 0
-        for packed in bits:
-            for bit in self._unpackInt(packed, self.CELLS_PER_INT):
-                if cell == self.width * self.height: break
-                x, y = self._cellIndexToPosition(cell)
-                self[x][y] = bit
-                cell += 1
+        cells = ''.join(self._unpackInt(packed, self.CELLS_PER_INT) for packed in bits)
+        cells = cells[:self.width * self.height]
+        self.bits = int(cells[::-1], 2) if cells else 0
 
     def _unpackInt(self, packed, size):
-        bools = []
+        "Returns the size lowest bits of packed as binary digits, highest first."
         if packed < 0: raise ValueError("must be a positive integer")
-        for i in range(size):
-            n = 2 ** (self.CELLS_PER_INT - i - 1)
-            if packed >= n:
-                bools.append(True)
-                packed -= n
-            else:
-                bools.append(False)
-        return bools
+        return format(packed, '0%db' % size)[-size:]
+
+_positionTables = {}
+
+def _cellPositions(width, height):
+    "Returns the (x, y) position of every cell of a width x height Grid, in bit order."
+    if (width, height) not in _positionTables:
+        _positionTables[(width, height)] = [(x, y) for x in range(width) for y in range(height)]
+    return _positionTables[(width, height)]
+
+class GridColumn:
+    "Column x of a Grid, indexed by y.  Reads and writes go straight to the grid's bits."
+    __slots__ = ('grid', 'base', 'height')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.base = x * grid.height
+        self.height = grid.height
+
+    def _row(self, y):
+        "Returns y as a row index, counting negative y from the top like a list."
+        if -self.height <= y < 0: return y + self.height
+        raise IndexError('Grid row out of range')
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.height: y = self._row(y)
+        return (self.grid.bits >> (self.base + y)) & 1 == 1
+
+    def __setitem__(self, y, value):
+        if not 0 <= y < self.height: y = self._row(y)
+        if value:
+            self.grid.bits |= 1 << (self.base + y)
+        else:
+            self.grid.bits &= ~(1 << (self.base + y))
+
+    def __iter__(self):
+        column = self.grid.bits >> self.base
+        for y in range(self.height):
+            yield (column >> y) & 1 == 1
+
+    def __len__(self):
+        return self.height
+
+    def __eq__(self, other):
+        if not isinstance(other, (GridColumn, list)): return False
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
 
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1,2)):
@@ -368,21 +441,62 @@ class Actions:
         return (x + dx, y + dy)
     getSuccessor = staticmethod(getSuccessor)
 
+# Zobrist keys: a pseudo-random 64-bit number for each thing a game state can
+# hold (a food dot, a capsule, an agent in a given place), remembered once made
+_zobristKeys = {}
+
+def _zobristKey(item):
+    """
+    The key of item, a flat tuple of strings, numbers and None.  Keys are a
+    digest of the item alone, so every process gives an item the same key;
+    numbers are written as floats, so that equal items like (1, 2) and
+    (1.0, 2.0) share one.
+    """
+    key = _zobristKeys.get(item)
+    if key == None:
+        text = repr(tuple([float(part) if isinstance(part, (int, float)) else part for part in item]))
+        key = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'little')
+        _zobristKeys[item] = key
+    return key
+
+def _agentKey(index, agentState):
+    "The Zobrist key of agent index in agentState; equal agent states share keys."
+    configuration = agentState.configuration
+    if configuration == None:
+        return _zobristKey(('agent', index, None, None, None, agentState.scaredTimer))
+    x, y = configuration.pos
+    return _zobristKey(('agent', index, x, y, configuration.direction, agentState.scaredTimer))
+
 class GameStateData:
     """
+    The data of a game state: food, capsules, agent states and score.
 
+    A few derived values are kept up to date as moves are made rather than
+    recomputed when asked for: the number of food dots, their positions, the
+    ghost positions and a Zobrist hash of the food, capsules and agents.
+    Food and capsules should be removed with removeFood and removeCapsule,
+    and agent states changed through writableAgentState, to keep them right.
     """
     def __init__( self, prevState = None ):
         """
         Generates a new data packet by copying information from its predecessor.
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates( prevState.agentStates )
+            # The food, capsules and agent states are shared with prevState
+            # until a move changes them, when they are replaced rather than
+            # edited: see writableAgentState
+            self.food = prevState.food
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates[:]
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            self._numFood = prevState._numFood
+            self._foodPositions = prevState._foodPositions
+            self._ghostPositions = prevState._ghostPositions
+            self._zobrist = self._fullZobrist = prevState.zobristHash()
+        else:
+            self._clearDerived()
 
         self._foodEaten = None
         self._foodAdded = None
@@ -391,10 +505,14 @@ class GameStateData:
         self._lose = False
         self._win = False
         self.scoreChange = 0
+        # Indices of the agent states this state has its own copies of
+        self._copiedAgents = set()
 
     def deepCopy( self ):
         state = GameStateData( self )
         state.food = self.food.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates( self.agentStates )
         state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
@@ -408,6 +526,104 @@ class GameStateData:
             copiedStates.append( agentState.copy() )
         return copiedStates
 
+    def writableAgentState( self, agentIndex ):
+        """
+        Returns the AgentState of agentIndex for this state to change.  Agent
+        states are shared with the state this one was generated from, so the
+        first call for an agent replaces its state with a copy.
+        """
+        self._fullZobrist = None
+        if agentIndex not in self._copiedAgents:
+            agentState = self.agentStates[agentIndex]
+            # Copied agents are hashed as they are when the hash is asked for
+            if self._zobrist != None:
+                self._zobrist ^= _agentKey( agentIndex, agentState )
+            self.agentStates[agentIndex] = agentState.copy()
+            self._copiedAgents.add( agentIndex )
+        if agentIndex > 0:
+            self._ghostPositions = None
+        return self.agentStates[agentIndex]
+
+    def removeFood( self, position ):
+        "Removes the food dot at position, which must have one."
+        x, y = position
+        # The food grid is shared with the previous state
+        self.food = self.food.copy()
+        self.food[x][y] = False
+        if self._numFood != None:
+            self._numFood -= 1
+        if self._foodPositions != None:
+            self._foodPositions = self._foodPositions - frozenset( [position] )
+        if self._zobrist != None:
+            self._zobrist ^= _zobristKey( ('food', x, y) )
+        self._fullZobrist = None
+
+    def removeCapsule( self, position ):
+        "Removes the capsule at position."
+        self.capsules = [capsule for capsule in self.capsules if capsule != position]
+        if self._zobrist != None:
+            self._zobrist ^= _zobristKey( ('capsule',) + tuple( position ) )
+        self._fullZobrist = None
+
+    def numFood( self ):
+        if self._numFood == None:
+            self._numFood = self.food.count()
+        return self._numFood
+
+    def foodPositions( self ):
+        "Returns a frozenset of the positions of the food dots."
+        if self._foodPositions == None:
+            self._foodPositions = frozenset( self.food.asList() )
+        return self._foodPositions
+
+    def ghostPositions( self ):
+        "Returns a tuple of the positions of the ghosts."
+        if self._ghostPositions == None:
+            self._ghostPositions = tuple( [agentState.getPosition() for agentState in self.agentStates[1:]] )
+        return self._ghostPositions
+
+    def zobristHash( self ):
+        """
+        Returns the XOR of the Zobrist keys of the food dots, capsules and
+        agents.  Only the agents changed since the previous state are looked
+        up; the rest was kept up to date move by move.
+        """
+        if self._fullZobrist != None: return self._fullZobrist
+        if self._zobrist == None:
+            # Built some other way than by a move: hash everything once
+            zobrist = 0
+            for x, y in self.food.asList():
+                zobrist ^= _zobristKey( ('food', x, y) )
+            for capsule in self.capsules:
+                zobrist ^= _zobristKey( ('capsule',) + tuple( capsule ) )
+            self._zobrist = zobrist
+            self._copiedAgents = set( range( len( self.agentStates ) ) )
+        zobrist = self._zobrist
+        for agentIndex in self._copiedAgents:
+            zobrist ^= _agentKey( agentIndex, self.agentStates[agentIndex] )
+        self._fullZobrist = zobrist
+        return zobrist
+
+    def __getstate__( self ):
+        # The derived values are rebuilt on demand rather than pickled
+        state = self.__dict__.copy()
+        for name in ('_numFood', '_foodPositions', '_ghostPositions', '_zobrist', '_fullZobrist'):
+            state.pop( name, None )
+        state['_copiedAgents'] = set()
+        return state
+
+    def __setstate__( self, state ):
+        self.__dict__.update( state )
+        self._clearDerived()
+
+    def _clearDerived( self ):
+        "Forgets the derived values, to be recomputed from the data when asked for."
+        self._numFood = None
+        self._foodPositions = None
+        self._ghostPositions = None
+        self._zobrist = None
+        self._fullZobrist = None
+
     def __eq__( self, other ):
         """
         Allows two states to be compared.
@@ -424,17 +640,12 @@ class GameStateData:
         """
         Allows states to be keys of dictionaries.
         """
-        for i, state in enumerate( self.agentStates ):
-            try:
-                int(hash(state))
-            except TypeError as e:
-                print(e)
-                #hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113* hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575 )
+        return hash( (self.zobristHash(), self.score) )
 
     def __str__( self ):
         width, height = self.layout.width, self.layout.height
-        map = Grid(width, height)
+        # A Grid only holds booleans, so draw the characters into lists
+        map = [[' ' for y in range(height)] for x in range(width)]
         if type(self.food) == type((1,2)):
             self.food = reconstituteGrid(self.food)
         for x in range(width):
@@ -455,7 +666,9 @@ class GameStateData:
         for x, y in self.capsules:
             map[x][y] = 'o'
 
-        return str(map) + ("\nScore: %d\n" % self.score)
+        rows = [''.join([map[x][y] for x in range(width)]) for y in range(height)]
+        rows.reverse()
+        return '\n'.join(rows) + ("\nScore: %d\n" % self.score)
 
     def _foodWallStr( self, hasFood, hasWall ):
         if hasFood:
@@ -503,6 +716,126 @@ class GameStateData:
                 else: numGhosts += 1
             self.agentStates.append( AgentState( Configuration( pos, Directions.STOP), isPacman) )
         self._eaten = [False for a in self.agentStates]
+        self._clearDerived()
+
+###########################################
+# Binary format for grids and game states #
+###########################################
+
+# Version 1 of the format, little-endian throughout:
+#
+# grid:   GRID_HEADER (b'PGRD', version, width, height), then the cells
+#         column by column as the bits of an int, cell 0 in the lowest bit
+# state:  STATE_HEADER (b'PGSD', version, flags, width, height, number of
+#         agents, number of capsules, length of the layout text, score),
+#         then the food as above, a CAPSULE record per capsule, an AGENT
+#         record per agent and, if there is one, the layout text (UTF-8)
+#
+# The display hints (_foodEaten, _agentMoved...) and scoreChange, which are
+# reset on every move, are not kept.
+FORMAT_VERSION = 1
+GRID_HEADER = struct.Struct('<4sBHH')
+STATE_HEADER = struct.Struct('<4sBBHHHHId')
+CAPSULE = struct.Struct('<HH')
+AGENT = struct.Struct('<ddddBBBHHH')
+
+# State flags, and agent flags
+_WIN, _LOSE, _LAYOUT_TEXT = 1, 2, 4
+_PACMAN, _CONFIGURATION, _EATEN = 1, 2, 4
+_DIRECTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST, Directions.STOP]
+_DIRECTION_CODES = dict((direction, code) for code, direction in enumerate(_DIRECTIONS))
+
+def _checkHeader(magic, version, expected):
+    if magic != expected: raise Exception('Not an encoded %s' % ('grid' if expected == b'PGRD' else 'game state'))
+    if version != FORMAT_VERSION: raise Exception('Unsupported format version %d (expected %d)' % (version, FORMAT_VERSION))
+
+def _cellBytes(grid):
+    return grid.bits.to_bytes((grid.width * grid.height + 7) // 8, 'little')
+
+def _gridFromCells(width, height, buffer, offset):
+    "Returns the grid whose cells start at offset in buffer, and the offset after them."
+    end = offset + (width * height + 7) // 8
+    grid = Grid(width, height)
+    grid.bits = int.from_bytes(buffer[offset:end], 'little')
+    return grid, end
+
+def encodeGrid(grid):
+    "Returns a Grid as bytes; see decodeGrid."
+    return GRID_HEADER.pack(b'PGRD', FORMAT_VERSION, grid.width, grid.height) + _cellBytes(grid)
+
+def decodeGrid(buffer):
+    "Returns the Grid encoded by encodeGrid."
+    magic, version, width, height = GRID_HEADER.unpack_from(buffer)
+    _checkHeader(magic, version, b'PGRD')
+    return _gridFromCells(width, height, buffer, GRID_HEADER.size)[0]
+
+def _number(value):
+    "Integral values come back as ints, so coordinates can index Grids as before."
+    return int(value) if value == int(value) else value
+
+def encodeGameStateData(data, withLayout=False):
+    """
+    Returns a GameStateData as bytes; see decodeGameStateData.  The layout is
+    only identified by its size unless withLayout is True, in which case its
+    text is included, so the state can be decoded without it.
+    """
+    layoutText = '\n'.join(data.layout.layoutText).encode('utf-8') if withLayout else b''
+    flags = (_WIN if data._win else 0) | (_LOSE if data._lose else 0) | (_LAYOUT_TEXT if withLayout else 0)
+    header = STATE_HEADER.pack(b'PGSD', FORMAT_VERSION, flags, data.food.width, data.food.height,
+                               len(data.agentStates), len(data.capsules), len(layoutText), data.score)
+
+    capsules = []
+    for x, y in data.capsules: capsules.extend((x, y))
+    agents = []
+    for index, agentState in enumerate(data.agentStates):
+        configuration = agentState.configuration or agentState.start
+        agentFlags = (_PACMAN if agentState.isPacman else 0) | \
+                     (_CONFIGURATION if agentState.configuration != None else 0) | \
+                     (_EATEN if data._eaten[index] else 0)
+        agents.extend(agentState.start.pos + configuration.pos)
+        agents.extend((_DIRECTION_CODES[agentState.start.direction], _DIRECTION_CODES[configuration.direction],
+                       agentFlags, agentState.scaredTimer, agentState.numCarrying, agentState.numReturned))
+
+    return b''.join([header, _cellBytes(data.food),
+                     struct.pack('<' + CAPSULE.format[1:] * len(data.capsules), *capsules),
+                     struct.pack('<' + AGENT.format[1:] * len(data.agentStates), *agents),
+                     layoutText])
+
+def decodeGameStateData(buffer, layout=None):
+    """
+    Returns the GameStateData encoded by encodeGameStateData, on layout.  The
+    layout may be left out if its text was encoded with the state.
+    """
+    magic, version, flags, width, height, numAgents, numCapsules, textLength, score = STATE_HEADER.unpack_from(buffer)
+    _checkHeader(magic, version, b'PGSD')
+    food, offset = _gridFromCells(width, height, buffer, STATE_HEADER.size)
+    capsules = list(CAPSULE.iter_unpack(buffer[offset:offset + CAPSULE.size * numCapsules]))
+    offset += CAPSULE.size * numCapsules
+    agents = list(AGENT.iter_unpack(buffer[offset:offset + AGENT.size * numAgents]))
+    offset += AGENT.size * numAgents
+
+    if layout == None:
+        if not flags & _LAYOUT_TEXT: raise Exception('This state was encoded without its layout; pass the layout in')
+        import layout as layoutModule
+        layout = layoutModule.Layout(bytes(buffer[offset:offset + textLength]).decode('utf-8').split('\n'))
+    if (layout.width, layout.height) != (width, height):
+        raise Exception('The state is for a %dx%d layout, not %dx%d' % (width, height, layout.width, layout.height))
+
+    data = GameStateData()
+    data.food, data.capsules, data.layout = food, capsules, layout
+    data.score = _number(score)
+    data._win, data._lose = bool(flags & _WIN), bool(flags & _LOSE)
+    data.agentStates, data._eaten = [], []
+    for startX, startY, x, y, startDirection, direction, agentFlags, scaredTimer, numCarrying, numReturned in agents:
+        start = Configuration((_number(startX), _number(startY)), _DIRECTIONS[startDirection])
+        agentState = AgentState(start, bool(agentFlags & _PACMAN))
+        agentState.configuration = None
+        if agentFlags & _CONFIGURATION:
+            agentState.configuration = Configuration((_number(x), _number(y)), _DIRECTIONS[direction])
+        agentState.scaredTimer, agentState.numCarrying, agentState.numReturned = scaredTimer, numCarrying, numReturned
+        data.agentStates.append(agentState)
+        data._eaten.append(bool(agentFlags & _EATEN))
+    return data
 
 try:
     import boinc
@@ -14,6 +14,7 @@
 
 from pacman import GameState
 from util import manhattanDistance
+from mazeDistances import MazeDistanceOracle
 from game import Directions
 import random
 import util
@@ -382,6 +383,17 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         return decision
 
 
+def ghostDistance(oracle, pos, ghostPos):
+    """
+    The maze distance from Pacman's cell to a ghost, which may be half way
+    between two cells: half a step more than the distance to the nearer of
+    the two.
+    """
+    x, y = ghostPos
+    cells = set([(int(x), int(y)), (int(x + 0.5), int(y + 0.5))])
+    distance = min([oracle.pathLength(pos, cell) for cell in cells])
+    return distance if len(cells) == 1 else distance + 0.5
+
 def betterEvaluationFunction(currentGameState: GameState):
     """
       Your extreme ghost-hunting, pellet-nabbing, food-gobbling, unstoppable
@@ -397,11 +409,14 @@ def betterEvaluationFunction(currentGameState: GameState):
     pos = currentGameState.getPacmanPosition()
     score = currentGameState.getScore()
 
+    # Maze distances are looked up, not searched for
+    oracle = MazeDistanceOracle.forWalls(currentGameState.getWalls())
+
     # Higher score for avoiding ghosts or eating ghosts
     for ghost in ghosts:
         
         # Get the distance to the ghost
-        distance = manhattanDistance(pos, ghost.getPosition())
+        distance = ghostDistance(oracle, pos, ghost.getPosition())
 
         if distance > 0:
             
@@ -417,7 +432,7 @@ def betterEvaluationFunction(currentGameState: GameState):
           # Don't die
           return float("-inf")
 
-    distances = [manhattanDistance(pos, food) for food in food]
+    distances = [oracle.pathLength(pos, food) for food in food]
 
     # Higher score for finding food areas
     # for distance in distances:
@@ -31,7 +31,7 @@ from game import Agent
 from pacman import GameState
 from ghostAgents import RandomGhost, DirectionalGhost
 import random, math, traceback, sys, os
-import layout, pacman
+import layout, pacman, exploration
 import autograder
 # import grading
 
@@ -166,8 +166,12 @@ class GradingAgent(Agent):
         random.seed(self.seed)
 
     def getAction(self, state):
-        GameState.getAndResetExplored()
-        studentAction = (self.studentAgent.getAction(state), len(GameState.getAndResetExplored()))
+        # Count the distinct states the student's agent explores from this one
+        tracker = exploration.ExactTracker()
+        state.explorationTracker = tracker
+        studentAction = (self.studentAgent.getAction(state), tracker.count())
+        # The game goes on from this state; stop recording its later states
+        state.explorationTracker = None
         optimalActions = self.optimalActions[self.stepCount]
         altDepthActions = self.altDepthActions[self.stepCount]
         partialPlyBugActions = self.partialPlyBugActions[self.stepCount]
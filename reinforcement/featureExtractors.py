@@ -15,6 +15,7 @@
 "Feature extractors for Pacman game states"
 
 from game import Directions, Actions
+import distanceFields
 import util
 
 class FeatureExtractor:
@@ -43,25 +44,12 @@ class CoordinateExtractor(FeatureExtractor):
 
 def closestFood(pos, food, walls):
     """
-    closestFood -- this is similar to the function that we have
-    worked on in the search project; here its all in one place
+    closestFood -- the maze distance from pos to the nearest food, or None
+    if there is none to reach.  The distances to the food from every cell
+    are computed together and kept until the food changes, so the other
+    actions from the same state are lookups.
     """
-    fringe = [(pos[0], pos[1], 0)]
-    expanded = set()
-    while fringe:
-        pos_x, pos_y, dist = fringe.pop(0)
-        if (pos_x, pos_y) in expanded:
-            continue
-        expanded.add((pos_x, pos_y))
-        # if we find a food at this location then exit
-        if food[pos_x][pos_y]:
-            return dist
-        # otherwise spread out from the location to its neighbours
-        nbrs = Actions.getLegalNeighbors((pos_x, pos_y), walls)
-        for nbr_x, nbr_y in nbrs:
-            fringe.append((nbr_x, nbr_y, dist+1))
-    # no food found
-    return None
+    return distanceFields.gridField(walls, food).distance(pos)
 
 class SimpleExtractor(FeatureExtractor):
     """
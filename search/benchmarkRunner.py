@@ -0,0 +1,244 @@
+"""
+Runs every combination of layout, search function, problem and heuristic and
+reports nodes, cost, time and peak memory for each run.
+
+Problems are built straight from layout.getLayout, with no display.  Each run
+happens in its own worker process (a pool with one task per child), under a
+timeout and an address space limit, so one slow or greedy combination cannot
+stall or sink the rest:
+
+> python benchmarkRunner.py -l tinyMaze,mediumMaze -f bfs,astar --timeout 5
+> python benchmarkRunner.py -p CornersProblem,BitboardCornersProblem -o corners.json
+> python benchmarkRunner.py -o new.json --baseline corners.json
+
+With --baseline, runs are matched against a results file written earlier with
+-o, and any that now fail, find a worse plan, expand more nodes or take
+noticeably longer are flagged as regressions (and the exit status is 1).
+"""
+
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+import util
+
+# The search functions run by default, by their names in search.py
+FUNCTIONS = ['depthFirstSearch', 'breadthFirstSearch', 'uniformCostSearch', 'aStarSearch',
+             'decreaseKeySearch', 'bidirectionalSearch', 'iterativeDeepeningAStarSearch',
+             'smaStarSearch']
+
+# The problems run by default, and the heuristics that apply to each
+HEURISTICS = {
+    'PositionSearchProblem': ['nullHeuristic', 'manhattanHeuristic', 'euclideanHeuristic'],
+    'CornersProblem': ['nullHeuristic', 'cornersHeuristic'],
+    'BitboardCornersProblem': ['nullHeuristic', 'bitboardCornersHeuristic'],
+    'FoodSearchProblem': ['nullHeuristic', 'foodHeuristic', 'mstFoodHeuristic'],
+    'BitboardFoodSearchProblem': ['nullHeuristic', 'bitboardFoodHeuristic', 'mstFoodHeuristic'],
+}
+
+# Functions that need a method SearchProblem leaves undefined
+NEEDS = {'bidirectionalSearch': 'getPredecessors'}
+
+COLUMNS = ['layout', 'function', 'problem', 'heuristic', 'status', 'cost', 'expanded', 'seconds', 'peakRSS']
+
+
+def lookup(name):
+    "Returns the function or problem class called name."
+    import search
+    import searchAgents
+    import foodHeuristics
+    for module in (searchAgents, search, foodHeuristics):
+        if name in dir(module): return getattr(module, name)
+    raise AttributeError(name + ' is not defined in searchAgents.py, search.py or foodHeuristics.py')
+
+def makeProblem(problemType, gameState):
+    "Builds a problem with its warnings and display updates turned off."
+    arguments = problemType.__init__.__code__.co_varnames
+    options = dict((name, False) for name in ('warn', 'visualize') if name in arguments)
+    return problemType(gameState, **options)
+
+def combinations(layouts, functions, problems, heuristics=None):
+    """
+    Returns the (layout, function, problem, heuristic) runs to make: every
+    applicable heuristic (or None) for functions that take one.  heuristics,
+    if given, limits the heuristics to those names.
+    """
+    import search
+    runs = []
+    for layoutName in layouts:
+        for functionName in functions:
+            function = lookup(functionName)
+            takesHeuristic = 'heuristic' in function.__code__.co_varnames[:function.__code__.co_argcount]
+            for problemName in problems:
+                if functionName in NEEDS:
+                    method = NEEDS[functionName]
+                    if getattr(lookup(problemName), method, None) in (None, getattr(search.SearchProblem, method)): continue
+                if not takesHeuristic:
+                    runs.append((layoutName, functionName, problemName, None))
+                    continue
+                for heuristicName in HEURISTICS.get(problemName, ['nullHeuristic']):
+                    if heuristics == None or heuristicName in heuristics:
+                        runs.append((layoutName, functionName, problemName, heuristicName))
+    return runs
+
+
+def _limitMemory(megabytes):
+    "Pool initializer: caps the address space of each worker."
+    if megabytes:
+        limit = megabytes * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def runOne(run, timeout):
+    """
+    Makes one run in the current process and returns its result row as a
+    dictionary with the keys in COLUMNS.  Status is ok, no path, timeout,
+    memory or the name of the exception raised.
+    """
+    from benchmarks import loadGameState
+    from searchStats import recordSearch
+    layoutName, functionName, problemName, heuristicName = run
+    row = dict(zip(COLUMNS, run + ('ok', None, None, None, None)))
+
+    util.mutePrint()
+    start = time.perf_counter()
+    try:
+        problem = makeProblem(lookup(problemName), loadGameState(layoutName))
+        heuristic = lookup(heuristicName) if heuristicName != None else None
+        actions, record = util.TimeoutFunction(recordSearch, timeout)(lookup(functionName), problem, heuristic)
+        row['expanded'] = record['expanded']
+        # Searches return an empty plan when they find no path
+        if not actions and not problem.isGoalState(problem.getStartState()):
+            row['status'] = 'no path'
+        else:
+            row['cost'] = record['cost']
+    except util.TimeoutFunctionException:
+        row['status'] = 'timeout'
+    except MemoryError:
+        row['status'] = 'memory'
+    except (Exception, SystemExit) as e:
+        # util.raiseNotDefined exits, which would take the worker down with it
+        row['status'] = type(e).__name__
+    finally:
+        util.unmutePrint()
+    row['seconds'] = round(time.perf_counter() - start, 4)
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    row['peakRSS'] = maxrss // 1024 if sys.platform == 'darwin' else maxrss
+    return row
+
+def _runOne(arguments):
+    return runOne(*arguments)
+
+def runAll(runs, timeout=10, memory=1024, workers=None):
+    """
+    Makes every run in a pool of worker processes, each process used for a
+    single run so peak RSS is measured per run.  Returns the result rows in
+    the order of runs.  memory is the cap in megabytes (0 for none).
+    """
+    pool = multiprocessing.Pool(workers, _limitMemory, (memory,), maxtasksperchild=1)
+    try:
+        return pool.map(_runOne, [(run, timeout) for run in runs], chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def key(row):
+    return (row['layout'], row['function'], row['problem'], row['heuristic'])
+
+def regressions(rows, baseline, slowdown=1.5, minSeconds=0.05):
+    """
+    Compares result rows against baseline rows and returns (row, reason) for
+    every regression: a run that used to succeed but no longer does, finds a
+    costlier plan, expands more nodes, or takes over slowdown times as long
+    (ignoring runs faster than minSeconds, which are mostly noise).  Only
+    runs that found a plan in the baseline are compared.
+    """
+    old = dict((key(row), row) for row in baseline)
+    found = []
+    for row in rows:
+        before = old.get(key(row))
+        if before == None or before['status'] != 'ok' or before['cost'] == None: continue
+        if row['status'] != 'ok':
+            found.append((row, row['status']))
+        elif row['cost'] > before['cost']:
+            found.append((row, 'cost %s > %s' % (row['cost'], before['cost'])))
+        elif row['expanded'] > before['expanded']:
+            found.append((row, 'expanded %s > %s' % (row['expanded'], before['expanded'])))
+        elif row['seconds'] > max(before['seconds'] * slowdown, minSeconds):
+            found.append((row, 'seconds %.2f > %.2f' % (row['seconds'], before['seconds'])))
+    return found
+
+
+def readCommand(argv):
+    "Processes the command used to run the benchmarks."
+    from optparse import OptionParser
+    usageStr = """
+    USAGE:      python benchmarkRunner.py <options>
+    EXAMPLES:   (1) python benchmarkRunner.py
+                    - runs every combination on every layout
+                (2) python benchmarkRunner.py -l mediumMaze -f astar -p PositionSearchProblem
+                    - runs A* with each position heuristic on mediumMaze
+                (3) python benchmarkRunner.py -o after.json --baseline before.json
+                    - saves the results and flags regressions against before.json
+    """
+    parser = OptionParser(usageStr)
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='comma-separated layouts to run (default: all of layouts/)')
+    parser.add_option('-f', '--functions', dest='functions', default=','.join(FUNCTIONS),
+                      help='comma-separated search functions (abbreviations like astar work)')
+    parser.add_option('-p', '--problems', dest='problems', default=','.join(sorted(HEURISTICS)),
+                      help='comma-separated problem types')
+    parser.add_option('-H', '--heuristics', dest='heuristics', default=None,
+                      help='comma-separated heuristics to limit runs to (default: all that apply)')
+    parser.add_option('-t', '--timeout', dest='timeout', type='int', default=10,
+                      help='seconds allowed per run (default %default)')
+    parser.add_option('-m', '--memory', dest='memory', type='int', default=1024,
+                      help='megabytes of address space allowed per run, 0 for no limit (default %default)')
+    parser.add_option('-w', '--workers', dest='workers', type='int', default=None,
+                      help='worker processes (default: one per CPU)')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='save the results to this JSON file')
+    parser.add_option('-b', '--baseline', dest='baseline', default=None,
+                      help='JSON results to compare against')
+    parser.add_option('--slowdown', dest='slowdown', type='float', default=1.5,
+                      help='flag runs this many times slower than the baseline (default %default)')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+def runCommand(options):
+    "Runs the benchmarks and returns the exit status: 1 if anything regressed."
+    from benchmarks import layoutNames, printTable
+    layouts = options.layouts.split(',') if options.layouts else layoutNames()
+    functions = [lookup(name).__name__ for name in options.functions.split(',')]
+    problems = options.problems.split(',')
+    heuristics = options.heuristics.split(',') if options.heuristics else None
+
+    runs = combinations(layouts, functions, problems, heuristics)
+    print('Running %d combinations' % len(runs))
+    start = time.time()
+    rows = runAll(runs, options.timeout, options.memory, options.workers)
+    printTable(COLUMNS, [[row[column] for column in COLUMNS] for row in rows])
+    print('Finished in %.1f seconds' % (time.time() - start))
+
+    if options.output != None:
+        with open(options.output, 'w') as f:
+            json.dump(rows, f, indent=2)
+            f.write('\n')
+
+    if options.baseline == None: return 0
+    with open(options.baseline) as f:
+        found = regressions(rows, json.load(f), options.slowdown)
+    for row, reason in found:
+        print('REGRESSION %s %s %s %s: %s' % (key(row) + (reason,)))
+    print('%d regressions against %s' % (len(found), options.baseline))
+    return 1 if found else 0
+
+if __name__ == '__main__':
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(runCommand(readCommand(sys.argv[1:])))
@@ -0,0 +1,316 @@
+"""
+Benchmarks for the search project.  Run one of them by name:
+
+> python benchmarks.py priorityQueues
+> python benchmarks.py containers
+> python benchmarks.py foodHeuristics
+> python benchmarks.py eightPuzzle
+> python benchmarks.py closestDot
+> python benchmarks.py parallelAStar
+
+Every benchmark prints a plain-text table, one row per measurement.
+"""
+
+import os
+import sys
+import time
+
+import eightpuzzle
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+
+def loadGameState(layoutName):
+    "Returns the starting GameState of a layout in layouts/, without ghosts."
+    lay = layout.getLayout(layoutName)
+    if lay == None: raise Exception('The layout ' + layoutName + ' cannot be found')
+    gameState = pacman.GameState()
+    gameState.initialize(lay, 0)
+    return gameState
+
+def layoutNames():
+    "Returns the names of every layout in layouts/, sorted."
+    return sorted(name[:-4] for name in os.listdir('layouts') if name.endswith('.lay'))
+
+def farthestFoodProblem(gameState):
+    """
+    Returns a PositionSearchProblem from Pacman's position to the food dot
+    farthest away from it (by Manhattan distance), or None if there is no food.
+    """
+    start = gameState.getPacmanPosition()
+    food = gameState.getFood().asList()
+    if not food: return None
+    goal = max(food, key=lambda xy: (util.manhattanDistance(start, xy), xy))
+    return searchAgents.PositionSearchProblem(gameState, goal=goal, warn=False, visualize=False)
+
+def printTable(header, rows):
+    "Prints rows of values as left-aligned columns."
+    rows = [[str(value) for value in row] for row in [header] + rows]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    for row in rows:
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip())
+
+
+###################
+# Priority queues #
+###################
+
+class _PeakHeap:
+    "Mixin for the priority queues which records the largest heap seen."
+    peak = 0
+
+    def push(self, item, priority):
+        super().push(item, priority)
+        _PeakHeap.peak = max(_PeakHeap.peak, len(self.heap))
+
+class _PeakPriorityQueue(_PeakHeap, util.PriorityQueue): pass
+class _PeakIndexedPriorityQueue(_PeakHeap, util.IndexedPriorityQueue): pass
+
+def _runPeakHeap(function, *args):
+    """
+    Runs a search function with the util priority queues swapped for copies
+    which record their peak size.  Returns (actions, peak heap size, seconds).
+    """
+    originals = util.PriorityQueue, util.IndexedPriorityQueue
+    util.PriorityQueue, util.IndexedPriorityQueue = _PeakPriorityQueue, _PeakIndexedPriorityQueue
+    _PeakHeap.peak = 0
+    try:
+        start = time.perf_counter()
+        actions = function(*args)
+        return actions, _PeakHeap.peak, time.perf_counter() - start
+    finally:
+        util.PriorityQueue, util.IndexedPriorityQueue = originals
+
+def benchmarkPriorityQueues(layouts=None):
+    """
+    Compares the lazy-deletion fringe (duplicate entries skipped when popped)
+    against the decrease-key fringe for UCS and A* with the Manhattan
+    heuristic, on a PositionSearchProblem to the farthest food of each layout.
+    """
+    rows = []
+    for name in layouts or layoutNames():
+        gameState = loadGameState(name)
+        if farthestFoodProblem(gameState) == None: continue
+        for algorithm, heuristic in [('ucs', search.nullHeuristic), ('astar', searchAgents.manhattanHeuristic)]:
+            results = []
+            for decreaseKey in (False, True):
+                problem = farthestFoodProblem(gameState)
+                actions, peak, seconds = _runPeakHeap(search.aStarSearch, problem, heuristic, decreaseKey)
+                results.append((problem.getCostOfActions(actions), problem._expanded, peak, seconds))
+            (cost, expanded, lazyPeak, lazyTime), (dkCost, _, dkPeak, dkTime) = results
+            assert cost == dkCost, 'decrease-key search found a different cost on ' + name
+            rows.append([name, algorithm, cost, expanded, lazyPeak, dkPeak,
+                         '%.4f' % lazyTime, '%.4f' % dkTime])
+    printTable(['layout', 'search', 'cost', 'expanded', 'lazy heap', 'dk heap', 'lazy s', 'dk s'], rows)
+
+
+##############
+# Containers #
+##############
+
+class _ListQueue:
+    "The list-backed queue util.Queue used to be, kept for comparison."
+    def __init__(self):
+        self.list = []
+
+    def push(self, item):
+        self.list.insert(0, item)
+
+    def pop(self):
+        return self.list.pop()
+
+def _timePushPop(container, sizes, extend=False):
+    """
+    Pushes range(size) onto a fresh container then pops everything, for each
+    size.  Returns the seconds taken for each size.
+    """
+    times = []
+    for size in sizes:
+        fringe = container()
+        start = time.perf_counter()
+        if extend:
+            fringe.extend(range(size))
+        else:
+            for item in range(size):
+                fringe.push(item)
+        for _ in range(size):
+            fringe.pop()
+        times.append(time.perf_counter() - start)
+    return times
+
+def benchmarkContainers(sizes=(10000, 100000, 1000000), legacyLimit=100000):
+    """
+    Times size pushes followed by size pops for the util containers, pushing
+    one item at a time and in one extend call, against the old list-backed
+    queue.  The old queue is quadratic, so it is skipped above legacyLimit.
+    """
+    priorityQueue = lambda: util.PriorityQueueWithFunction(lambda item: item % 1000)
+
+    rows = []
+    legacySizes = [size for size in sizes if size <= legacyLimit]
+    legacy = _timePushPop(_ListQueue, legacySizes) + [None] * (len(sizes) - len(legacySizes))
+    rows.append(['list Queue (old)', 'push'] + ['%.4f' % t if t != None else 'skipped' for t in legacy])
+    for name, container in [('Queue', util.Queue), ('Stack', util.Stack), ('PriorityQueue', priorityQueue)]:
+        for extend in (False, True):
+            times = _timePushPop(container, sizes, extend)
+            rows.append([name, 'extend' if extend else 'push'] + ['%.4f' % t for t in times])
+    printTable(['container', 'fill'] + ['%d s' % size for size in sizes], rows)
+
+
+###################
+# Food heuristics #
+###################
+
+FOOD_HEURISTICS = ['nullHeuristic', 'bitboardFoodHeuristic', 'mstFoodHeuristic',
+                   'farthestPairFoodHeuristic', 'patternDatabaseFoodHeuristic']
+
+def benchmarkFoodHeuristics(layouts=('testSearch', 'tinySearch', 'smallSearch', 'trickySearch', 'greedySearch', 'mediumSearch'),
+                            heuristics=FOOD_HEURISTICS, timeout=30):
+    """
+    Runs A* with each food heuristic on the BitboardFoodSearchProblem of each
+    layout, and reports the cost found, nodes expanded and seconds taken
+    (including any precomputation).  Runs over timeout seconds are stopped.
+    """
+    rows = []
+    for name in layouts:
+        gameState = loadGameState(name)
+        for heuristicName in heuristics:
+            heuristic = getattr(searchAgents, heuristicName, None) or getattr(search, heuristicName)
+            problem = searchAgents.BitboardFoodSearchProblem(gameState)
+            start = time.perf_counter()
+            try:
+                actions = util.TimeoutFunction(search.aStarSearch, timeout)(problem, heuristic)
+                cost = problem.getCostOfActions(actions)
+            except util.TimeoutFunctionException:
+                cost = 'timeout'
+            rows.append([name, gameState.getNumFood(), heuristicName, cost, problem._expanded,
+                         '%.2f' % (time.perf_counter() - start)])
+    printTable(['layout', 'food', 'heuristic', 'cost', 'expanded', 'seconds'], rows)
+
+
+################
+# Eight puzzle #
+################
+
+class _ExhaustiveEightPuzzleProblem(eightpuzzle.EightPuzzleSearchProblem):
+    "An eight puzzle problem with no goal, so a search visits every reachable state."
+    def __init__(self, puzzle):
+        eightpuzzle.EightPuzzleSearchProblem.__init__(self, puzzle)
+        self.expanded = 0
+
+    def isGoalState(self, state):
+        return False
+
+    def getSuccessors(self, state):
+        self.expanded += 1
+        return eightpuzzle.EightPuzzleSearchProblem.getSuccessors(self, state)
+
+def benchmarkEightPuzzle():
+    """
+    Times breadth-first search over the whole state space reachable from the
+    solved eight puzzle (181,440 states), and over the state spaces of the
+    puzzles in EIGHT_PUZZLE_DATA until they are solved.
+    """
+    rows = []
+    problem = _ExhaustiveEightPuzzleProblem(eightpuzzle.EightPuzzleState(list(range(9))))
+    start = time.perf_counter()
+    search.breadthFirstSearch(problem)
+    rows.append(['whole space', '-', problem.expanded, '%.2f' % (time.perf_counter() - start)])
+    for number in range(len(eightpuzzle.EIGHT_PUZZLE_DATA)):
+        problem = eightpuzzle.EightPuzzleSearchProblem(eightpuzzle.loadEightPuzzle(number))
+        start = time.perf_counter()
+        actions = search.breadthFirstSearch(problem)
+        rows.append(['puzzle %d' % number, len(actions), '-', '%.2f' % (time.perf_counter() - start)])
+    printTable(['search', 'moves', 'expanded', 'seconds'], rows)
+
+
+###############
+# Closest dot #
+###############
+
+def benchmarkClosestDot(layouts=('trickySearch', 'mediumSearch', 'bigSearch', 'mediumCorners', 'bigCorners')):
+    """
+    Times the planning done by ClosestDotSearchAgent over a whole game (the
+    findPathToClosestDot calls, not the game states it steps through), with
+    a new A* search for each dot (with no heuristic, or with the food
+    distance field of anyFoodHeuristic) against one D* Lite planner
+    repaired after each dot.
+    """
+    rows = []
+    for name in layouts:
+        gameState = loadGameState(name)
+        for planner in ('astar', 'field', 'dstar'):
+            util.mutePrint()
+            try:
+                agent = searchAgents.ClosestDotSearchAgent(planner=planner)
+                timer = {'seconds': 0.0}
+                findPath = agent.findPathToClosestDot
+                def timedFindPath(state):
+                    start = time.perf_counter()
+                    path = findPath(state)
+                    timer['seconds'] += time.perf_counter() - start
+                    return path
+                agent.findPathToClosestDot = timedFindPath
+                agent.registerInitialState(gameState)
+            finally:
+                util.unmutePrint()
+            rows.append([name, gameState.getNumFood(), planner, len(agent.actions), '%.4f' % timer['seconds']])
+    printTable(['layout', 'food', 'planner', 'path length', 'planning s'], rows)
+
+
+###############
+# Parallel A* #
+###############
+
+def benchmarkParallelAStar(layouts=('tinySearch', 'smallSearch', 'trickySearch', 'greedySearch'),
+                           workers=(1, 2, 4, 8), heuristic='nullHeuristic', timeout=60):
+    """
+    Scaling report for parallelAStarSearch: the seconds taken and nodes
+    expanded by A* on the BitboardFoodSearchProblem of each layout, then by
+    hash-distributed A* with each number of workers, with the speedup over
+    A*.  Runs over timeout seconds are stopped.
+    """
+    heuristic = getattr(searchAgents, heuristic, None) or getattr(search, heuristic)
+    print('%d CPUs' % (os.cpu_count() or 1))
+    rows = []
+    for name in layouts:
+        gameState = loadGameState(name)
+        serialSeconds = None
+        for count in (None,) + tuple(workers):
+            problem = searchAgents.BitboardFoodSearchProblem(gameState)
+            if count == None:
+                run = lambda: search.aStarSearch(problem, heuristic)
+            else:
+                run = lambda: search.parallelAStarSearch(problem, heuristic, count)
+            start = time.perf_counter()
+            try:
+                actions = util.TimeoutFunction(run, timeout)()
+                cost = problem.getCostOfActions(actions)
+            except util.TimeoutFunctionException:
+                rows.append([name, count or 'A*', 'timeout', '-', '-', '-'])
+                continue
+            seconds = time.perf_counter() - start
+            if count == None: serialSeconds = seconds
+            speedup = '%.2f' % (serialSeconds / seconds) if serialSeconds else '-'
+            rows.append([name, count or 'A*', cost, problem._expanded, '%.2f' % seconds, speedup])
+    printTable(['layout', 'workers', 'cost', 'expanded', 'seconds', 'speedup'], rows)
+
+BENCHMARKS = {
+    'closestDot': benchmarkClosestDot,
+    'containers': benchmarkContainers,
+    'eightPuzzle': benchmarkEightPuzzle,
+    'foodHeuristics': benchmarkFoodHeuristics,
+    'parallelAStar': benchmarkParallelAStar,
+    'priorityQueues': benchmarkPriorityQueues,
+}
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or sorted(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise Exception('Unknown benchmark %s; choose from %s' % (name, ', '.join(sorted(BENCHMARKS))))
+        print('### %s ###' % name)
+        BENCHMARKS[name]()
@@ -17,6 +17,27 @@ import random
 
 # Module Classes
 
+# Moves of the blank: name and change in (row, col)
+MOVES = [('up', -1, 0), ('down', 1, 0), ('left', 0, -1), ('right', 0, 1)]
+
+# For each cell the blank can be in (numbered row by row), the legal moves
+# in the order above and where each leaves the blank
+MOVE_TABLE = []
+for _blank in range(9):
+    _row, _col = divmod(_blank, 3)
+    MOVE_TABLE.append(dict((move, (_row + dr) * 3 + _col + dc) for move, dr, dc in MOVES
+                           if 0 <= _row + dr < 3 and 0 <= _col + dc < 3))
+LEGAL_MOVES = [list(moves) for moves in MOVE_TABLE]
+
+def packCells(numbers):
+    "Packs nine numbers into an int, four bits each, the first in the lowest bits."
+    board = 0
+    for i, number in enumerate(numbers):
+        board |= number << (4 * i)
+    return board
+
+GOAL_BOARD = packCells(range(9))
+
 class EightPuzzleState:
     """
     The Eight Puzzle is described in the course textbook on
@@ -25,7 +46,13 @@ class EightPuzzleState:
     This class defines the mechanics of the puzzle itself.  The
     task of recasting this puzzle as a search problem is left to
     the EightPuzzleSearchProblem class.
+
+    The puzzle is stored as a single int, 'board', holding the number in
+    each cell (row by row) in four bits, along with the index of the blank
+    cell.  Moves are looked up in MOVE_TABLE, so results, hashing and
+    equality take constant time.
     """
+    __slots__ = ('board', 'blank')
 
     def __init__( self, numbers ):
         """
@@ -45,19 +72,28 @@ class EightPuzzleState:
             -------------
             | 6 | 7 | 8 |
             ------------
-
-        The configuration of the puzzle is stored in a 2-dimensional
-        list (a list of lists) 'cells'.
         """
-        self.cells = []
-        numbers = numbers[:] # Make a copy so as not to cause side-effects.
-        numbers.reverse()
-        for row in range( 3 ):
-            self.cells.append( [] )
-            for col in range( 3 ):
-                self.cells[row].append( numbers.pop() )
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
+        self.board = packCells(numbers)
+        self.blank = list(numbers).index(0)
+
+    @classmethod
+    def fromBoard(cls, board, blank):
+        "Returns the puzzle for a packed board whose blank is at index blank."
+        puzzle = cls.__new__(cls)
+        puzzle.board = board
+        puzzle.blank = blank
+        return puzzle
+
+    @property
+    def cells(self):
+        "The configuration of the puzzle as a 2-dimensional list (a list of lists)."
+        board = self.board
+        return [[(board >> (4 * (row * 3 + col))) & 0xF for col in range(3)] for row in range(3)]
+
+    @property
+    def blankLocation(self):
+        "The (row, col) of the blank."
+        return divmod(self.blank, 3)
 
     def isGoal( self ):
         """
@@ -77,13 +113,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).isGoal()
         False
         """
-        current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
-                if current != self.cells[row][col]:
-                    return False
-                current += 1
-        return True
+        return self.board == GOAL_BOARD
 
     def legalMoves( self ):
         """
@@ -95,17 +125,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
         ['down', 'right']
         """
-        moves = []
-        row, col = self.blankLocation
-        if(row != 0):
-            moves.append('up')
-        if(row != 2):
-            moves.append('down')
-        if(col != 0):
-            moves.append('left')
-        if(col != 2):
-            moves.append('right')
-        return moves
+        return LEGAL_MOVES[self.blank][:]
 
     def result(self, move):
         """
@@ -113,37 +133,20 @@ class EightPuzzleState:
         updated based on the provided move.
 
         The move should be a string drawn from a list returned by legalMoves.
-        Illegal moves will raise an exception, which may be an array bounds
-        exception.
+        Illegal moves will raise an exception.
 
         NOTE: This function *does not* change the current object.  Instead,
         it returns a new object.
         """
-        row, col = self.blankLocation
-        if(move == 'up'):
-            newrow = row - 1
-            newcol = col
-        elif(move == 'down'):
-            newrow = row + 1
-            newcol = col
-        elif(move == 'left'):
-            newrow = row
-            newcol = col - 1
-        elif(move == 'right'):
-            newrow = row
-            newcol = col + 1
-        else:
-            raise "Illegal Move"
-
-        # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
-        newPuzzle.cells = [values[:] for values in self.cells]
-        # And update it to reflect the move
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
-        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
-
-        return newPuzzle
+        blank = self.blank
+        newBlank = MOVE_TABLE[blank].get(move)
+        if newBlank == None:
+            raise Exception('Illegal move: ' + str(move))
+
+        # The tile next to the blank slides into it
+        shift = 4 * newBlank
+        tile = (self.board >> shift) & 0xF
+        return EightPuzzleState.fromBoard(self.board & ~(0xF << shift) | (tile << (4 * blank)), newBlank)
 
     # Utilities for comparison and display
     def __eq__(self, other):
@@ -155,13 +158,10 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        return isinstance(other, EightPuzzleState) and self.board == other.board
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return hash(self.board)
 
     def __getAsciiString(self):
         """
@@ -196,7 +196,7 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -237,7 +237,7 @@ def loadEightPuzzle(puzzleNumber):
 
       puzzleNumber can range from 0 to 5.
 
-      >>> print loadEightPuzzle(0)
+      >>> print(loadEightPuzzle(0))
       -------------
       | 1 |   | 2 |
       -------------
@@ -0,0 +1,130 @@
+"""
+Exploration trackers: observers that record the game states an agent
+expands and generates with GameState.generateSuccessor.
+
+Tracking is off unless a tracker is attached to a game state; every state
+generated from that state (and from its successors, and so on) reports to
+the same tracker:
+
+  tracker = exploration.ExactTracker()
+  gameState.explorationTracker = tracker
+  agent.getAction(gameState)
+  print(tracker.count())
+
+A whole game can be tracked with pacman.py --explored MODE, where MODE is
+one of the names in TRACKERS.  The trackers trade accuracy for cost:
+
+  counter  counts successors generated; no hashing, constant memory
+  exact    the set of distinct states; a hash per state, memory per state
+  hll      estimates distinct states with a HyperLogLog; a hash per state,
+           a few kilobytes of memory, about 2% error
+"""
+
+import math
+
+class ExplorationTracker:
+    """
+    Receives every (parent, successor) pair generated from a state it is
+    attached to.  Subclasses override recordSuccessor and count.
+    """
+
+    def recordSuccessor(self, parent, successor):
+        "Called by GameState.generateSuccessor for each successor made."
+        pass
+
+    def count(self):
+        "Returns the number of states recorded."
+        return 0
+
+class CountingTracker(ExplorationTracker):
+    """
+    Counts the successors generated.  States reached twice are counted
+    twice, and the states expanded are not counted at all.
+    """
+
+    def __init__(self):
+        self.generated = 0
+
+    def recordSuccessor(self, parent, successor):
+        self.generated += 1
+
+    def count(self):
+        return self.generated
+
+class ExactTracker(ExplorationTracker):
+    "Keeps the set of distinct states expanded or generated."
+
+    def __init__(self):
+        self.states = set()
+        self._lastParent = None
+
+    def recordSuccessor(self, parent, successor):
+        # An agent usually generates all of a state's successors in a row
+        if parent is not self._lastParent:
+            self.states.add(parent)
+            self._lastParent = parent
+        self.states.add(successor)
+
+    def count(self):
+        return len(self.states)
+
+class HyperLogLogTracker(ExplorationTracker):
+    """
+    Estimates the number of distinct states expanded or generated, in
+    2 ** precision bytes whatever the number of states.  The standard error
+    is about 1.04 / sqrt(2 ** precision): 1.6% for the default precision.
+    """
+
+    def __init__(self, precision=12):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        self._lastParent = None
+
+    def recordSuccessor(self, parent, successor):
+        if parent is not self._lastParent:
+            self.add(parent)
+            self._lastParent = parent
+        self.add(successor)
+
+    def add(self, item):
+        "Records a hashable item."
+        x = _mix(hash(item))
+        rest = 64 - self.precision
+        index = x >> rest
+        # The position of the first 1 bit among the rest of the bits
+        rank = rest - (x & ((1 << rest) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros > 0:
+            # Few states: linear counting of the empty registers is more accurate
+            estimate = m * math.log(float(m) / zeros)
+        return int(round(estimate))
+
+_MASK64 = (1 << 64) - 1
+
+def _mix(value):
+    "Spreads a hash over 64 bits (the splitmix64 finalizer)."
+    value = (value + 0x9e3779b97f4a7c15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xbf58476d1ce4e5b9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94d049bb133111eb) & _MASK64
+    return value ^ (value >> 31)
+
+# Tracker classes by mode name, for command lines; 'off' attaches none
+TRACKERS = {
+    'counter': CountingTracker,
+    'exact': ExactTracker,
+    'hll': HyperLogLogTracker,
+}
+
+def makeTracker(mode):
+    "Returns a new tracker for a mode in TRACKERS, or None for 'off' or None."
+    if mode == None or mode == 'off': return None
+    if mode not in TRACKERS:
+        raise Exception('Unknown exploration tracker %s; choose from off, %s' % (mode, ', '.join(sorted(TRACKERS))))
+    return TRACKERS[mode]()
@@ -0,0 +1,192 @@
+"""
+Heuristics for FoodSearchProblem (and BitboardFoodSearchProblem), built on
+maze distances.
+
+Each heuristic precomputes what it needs for the layout the first time it is
+called and keeps it in problem.heuristicInfo, so later calls only combine
+lookups:
+
+  mstFoodHeuristic             distance to the nearest dot plus the weight
+                               of a minimum spanning tree over the dots
+  farthestPairFoodHeuristic    the two remaining dots farthest apart, which
+                               must both be reached
+  patternDatabaseFoodHeuristic exact cost of eating each of several disjoint
+                               groups of dots on their own, from a table
+                               computed once per group
+
+All three are admissible and consistent.  A dot Pacman cannot reach counts
+as 0 steps away (MazeDistanceOracle.pathLength), as in foodHeuristic.
+Select one with, for example,
+
+> python pacman.py -l trickySearch -p SearchAgent -a fn=astar,prob=FoodSearchProblem,heuristic=mstFoodHeuristic
+"""
+
+import collections
+
+from mazeDistances import MazeDistanceOracle
+
+
+def _oracle(problem):
+    "Returns the maze distance oracle for the problem's walls."
+    if 'mazeDistances' not in problem.heuristicInfo:
+        problem.heuristicInfo['mazeDistances'] = MazeDistanceOracle.forWalls(problem.walls)
+    return problem.heuristicInfo['mazeDistances']
+
+def _remainingFood(state, problem):
+    """
+    Returns (position, food) for a state, where food is a tuple of the
+    remaining dots.  Food may be stored as a Grid or, for the bitboard
+    problem, as an int.
+    """
+    position, food = state
+    if isinstance(food, int):
+        return position, tuple(problem.cells.positions(food))
+    return position, tuple(food.asList())
+
+
+def mstFoodHeuristic(state, problem):
+    """
+    The maze distance to the nearest remaining dot, plus the total length of a
+    minimum spanning tree connecting the remaining dots.  Any path eating all
+    the dots starts with a walk to one of them and then spans the rest.
+
+    Spanning tree weights are cached by food set in heuristicInfo['mstWeights'],
+    which keeps the heuristicInfo['mstCacheSize'] (default 10000) most recently
+    used food sets, and the distances from each dot in
+    heuristicInfo['foodDistanceRows'].
+    """
+    position, food = _remainingFood(state, problem)
+    if not food: return 0
+    oracle = _oracle(problem)
+
+    weights = problem.heuristicInfo.setdefault('mstWeights', collections.OrderedDict())
+    if food in weights:
+        weights.move_to_end(food)
+    else:
+        # Prim's algorithm on the complete graph of maze distances, with the
+        # distance rows between dots looked up once per layout
+        rows = problem.heuristicInfo.setdefault('foodDistanceRows', {})
+        for dot in food:
+            if dot not in rows:
+                rows[dot] = oracle.pathLengthsFrom(dot)
+        weight = 0
+        remaining = list(food[1:])
+        row = rows[food[0]]
+        closest = [row[dot] for dot in remaining]
+        while remaining:
+            i = closest.index(min(closest))
+            weight += closest[i]
+            dot = remaining[i]
+            remaining[i], closest[i] = remaining[-1], closest[-1]
+            remaining.pop(); closest.pop()
+            row = rows[dot]
+            closest = [min(d, row[other]) for d, other in zip(closest, remaining)]
+        weights[food] = weight
+        if len(weights) > problem.heuristicInfo.get('mstCacheSize', 10000):
+            weights.popitem(last=False)
+
+    return min([oracle.pathLength(position, dot) for dot in food]) + weights[food]
+
+
+def farthestPairFoodHeuristic(state, problem):
+    """
+    For the two remaining dots farthest apart by maze distance, Pacman has to
+    reach one of them and then walk at least the distance to the other.  The
+    result is never below the distance to the farthest single dot.
+    """
+    position, food = _remainingFood(state, problem)
+    if not food: return 0
+    oracle = _oracle(problem)
+    distance = oracle.pathLength
+
+    a, b = max(((a, b) for i, a in enumerate(food) for b in food[i:]),
+               key=lambda pair: distance(*pair))
+
+    farthest = max([distance(position, dot) for dot in food])
+    return max(farthest, min(distance(position, a), distance(position, b)) + distance(a, b))
+
+
+class FoodPatternDatabase:
+    """
+    A disjoint pattern database for the food in a layout.
+
+    The starting dots are split into groups of at most groupSize dots that lie
+    close together in the maze.  For every group, and every subset S of it
+    still uneaten, the database stores the length of the shortest walk that
+    starts on each dot of S and eats all of S (a Held-Karp table over maze
+    distances).  The cost of eating the whole group from any position is then
+    a minimum over the dots of S, and the heuristic is the largest such cost
+    over the groups.
+    """
+
+    def __init__(self, food, oracle, groupSize=8):
+        self.oracle = oracle
+        self.groups = self._partition(list(food), groupSize)
+
+        # Where each dot lives: (group number, bit within the group)
+        self.dotBits = {}
+        for number, group in enumerate(self.groups):
+            for i, dot in enumerate(group):
+                self.dotBits[dot] = (number, 1 << i)
+        self.tables = [self._heldKarp(group) for group in self.groups]
+
+    def _partition(self, food, groupSize):
+        "Greedily groups each unassigned dot with its nearest unassigned dots."
+        distance = self.oracle.pathLength
+        food.sort()
+        groups = []
+        while food:
+            seed = food.pop(0)
+            food.sort(key=lambda dot: (distance(seed, dot), dot))
+            groups.append([seed] + food[:groupSize - 1])
+            food = sorted(food[groupSize - 1:])
+        return groups
+
+    def _heldKarp(self, group):
+        """
+        Returns table with table[subset][i] the shortest walk that starts on
+        group[i] (a member of subset) and eats every dot in subset.
+        """
+        distance = self.oracle.pathLength
+        size = len(group)
+        inf = float('inf')
+        table = [[inf] * size for _ in range(1 << size)]
+        for i in range(size):
+            table[1 << i][i] = 0
+        for subset in range(1, 1 << size):
+            members = [i for i in range(size) if subset & (1 << i)]
+            if len(members) < 2: continue
+            for i in members:
+                rest = subset & ~(1 << i)
+                table[subset][i] = min([distance(group[i], group[j]) + table[rest][j]
+                                        for j in members if j != i])
+        return table
+
+    def value(self, position, food):
+        "Returns the heuristic value of Pacman at position with the given dots left."
+        subsets = [0] * len(self.groups)
+        for dot in food:
+            number, bit = self.dotBits[dot]
+            subsets[number] |= bit
+
+        distance = self.oracle.pathLength
+        best = 0
+        for group, table, subset in zip(self.groups, self.tables, subsets):
+            if subset == 0: continue
+            row = table[subset]
+            cost = min([distance(position, dot) + row[i] for i, dot in enumerate(group) if subset & (1 << i)])
+            best = max(best, cost)
+        return best
+
+def patternDatabaseFoodHeuristic(state, problem):
+    """
+    The FoodPatternDatabase heuristic.  The database is built from the food in
+    the problem's start state and kept in heuristicInfo['patternDatabase'];
+    set heuristicInfo['patternGroupSize'] beforehand to change the group size.
+    """
+    if 'patternDatabase' not in problem.heuristicInfo:
+        _, startFood = _remainingFood(problem.getStartState(), problem)
+        groupSize = problem.heuristicInfo.get('patternGroupSize', 8)
+        problem.heuristicInfo['patternDatabase'] = FoodPatternDatabase(startFood, _oracle(problem), groupSize)
+    position, food = _remainingFood(state, problem)
+    return problem.heuristicInfo['patternDatabase'].value(position, food)
@@ -16,6 +16,7 @@ from game import Agent
 from game import Actions
 from game import Directions
 import random
+import distanceFields
 from util import manhattanDistance
 import util
 
@@ -61,10 +62,9 @@ class DirectionalGhost( GhostAgent ):
 
         actionVectors = [Actions.directionToVector( a, speed ) for a in legalActions]
         newPositions = [( pos[0]+a[0], pos[1]+a[1] ) for a in actionVectors]
-        pacmanPosition = state.getPacmanPosition()
 
         # Select best actions given the state
-        distancesToPacman = [manhattanDistance( pos, pacmanPosition ) for pos in newPositions]
+        distancesToPacman = self.distancesToPacman( state, newPositions )
         if isScared:
             bestScore = max( distancesToPacman )
             bestProb = self.prob_scaredFlee
@@ -79,3 +79,17 @@ class DirectionalGhost( GhostAgent ):
         for a in legalActions: dist[a] += ( 1-bestProb ) / len(legalActions)
         dist.normalize()
         return dist
+
+    def distancesToPacman( self, state, positions ):
+        "Returns how far each of positions is from Pacman."
+        pacmanPosition = state.getPacmanPosition()
+        return [manhattanDistance( pos, pacmanPosition ) for pos in positions]
+
+class MazeDirectionalGhost( DirectionalGhost ):
+    "A DirectionalGhost that measures the way to Pacman through the maze rather than through walls."
+    def distancesToPacman( self, state, positions ):
+        walls = state.getWalls()
+        field = distanceFields.positionField( walls, state.getPacmanPosition() )
+        # Cells cut off from Pacman are as far away as can be
+        distances = [field.distance( pos ) for pos in positions]
+        return [walls.width * walls.height if distance == None else distance for distance in distances]
@@ -1,7 +1,16 @@
 """
 Code to create a simple graph in a similar format to the test cases, but much simplified.
+
+For large graphs (road networks and the like) use read_csr_graph instead of
+read_graph: it streams the file into compressed sparse row arrays, and can
+keep a binary copy of them that later runs map straight into memory.
 """
 from search import SearchProblem, bfs, dfs, ucs, astar
+from array import array
+import mmap
+import os
+import struct
+import sys
 import util
 
 
@@ -43,7 +52,7 @@ class GraphProblem(SearchProblem):
         state, 'action' is the action required to get there, and 'stepCost' is
         the incremental cost of expanding to that successor.
         """
-        return self.edges[state]
+        return self.edges.get(state, [])
 
     def getCostOfActions(self, actions):
         """
@@ -83,6 +92,215 @@ def read_graph(filename=None, graph=None):
     return GraphProblem(start, goals, edges)
     
 
+class CSRGraph:
+    """
+    A directed graph in compressed sparse row form.
+
+    Nodes and actions are interned: node i is named names[i], and the edges
+    leaving it are positions offsets[i] to offsets[i + 1] of the parallel
+    arrays targets (node ids), actionIds (indices into actions) and costs.
+    The edges of each node keep the order they appear in the graph file.
+    """
+
+    def __init__(self, names, actions, offsets, targets, actionIds, costs, start, goals):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.actions = actions
+        self.offsets = offsets
+        self.targets = targets
+        self.actionIds = actionIds
+        self.costs = costs
+        self.start = start
+        self.goals = goals
+
+    def __len__(self):
+        return len(self.names)
+
+    def edges(self, node):
+        """
+        Returns the ids of the edges leaving node, a range of positions in
+        targets, actionIds and costs; nothing is copied.
+        """
+        return range(self.offsets[node], self.offsets[node + 1])
+
+    # The binary file: a header of int64s, the arrays, then the names and
+    # actions as newline separated UTF-8
+    MAGIC = b'CSRGRAPH'
+    HEADER = struct.Struct('<8s8q')
+    VERSION = 1
+
+    def save(self, path):
+        "Writes the graph to path in the binary format load reads."
+        names = '\n'.join(self.names).encode('utf-8')
+        actions = '\n'.join(self.actions).encode('utf-8')
+        goals = array('q', sorted(self.goals))
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, sys.byteorder == 'little', len(self.names),
+                                     len(self.targets), len(goals), self.start, len(names), len(actions)))
+            for values in (self.offsets, self.targets, self.actionIds, self.costs, goals):
+                array(values.typecode if isinstance(values, array) else values.format, values).tofile(f)
+            f.write(names)
+            f.write(actions)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Maps a graph written by save into memory.  The arrays are views of
+        the mapped file, so only the pages a search touches are read.
+        """
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, little, nodes, edges, goalCount, start, namesSize, actionsSize = \
+            cls.HEADER.unpack_from(buffer)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise Exception('%s is not a version %d graph cache' % (path, cls.VERSION))
+
+        view = memoryview(buffer)
+        position = [cls.HEADER.size]
+        def take(typecode, count):
+            size = 8 * count
+            values = view[position[0]:position[0] + size].cast(typecode)
+            position[0] += size
+            if bool(little) != (sys.byteorder == 'little'):
+                values = array(typecode, values)
+                values.byteswap()
+            return values
+        offsets = take('q', nodes + 1)
+        targets = take('q', edges)
+        actionIds = take('q', edges)
+        costs = take('d', edges)
+        goals = set(take('q', goalCount))
+        names = bytes(view[position[0]:position[0] + namesSize]).decode('utf-8').split('\n')
+        position[0] += namesSize
+        actions = bytes(view[position[0]:position[0] + actionsSize]).decode('utf-8').split('\n')
+
+        graph = cls(names if nodes else [], actions if edges else [], offsets, targets, actionIds, costs, start, goals)
+        graph.buffer = buffer
+        return graph
+
+
+def parse_csr_graph(lines):
+    """
+    Builds a CSRGraph from the lines of a graph file, read one at a time:
+    a start= line, a goals= line, then edge lines 'src action dst [cost]'
+    (cost defaults to 1).  Comments and blank lines are skipped.
+    """
+    ids, actionIds = {}, {}
+    sources, targets, edgeActions, costs = [], [], [], []
+    lines = iter(lines)
+
+    # The start= and goals= lines come first
+    header = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'): continue
+        expected = ('start=', 'goals=')[len(header)]
+        if not line.startswith(expected): raise Exception('Expected %s but found: %s' % (expected, line))
+        header.append(line.split('=', 1)[1])
+        if len(header) == 2: break
+    else:
+        raise Exception('The graph has no start= and goals= lines')
+    start = ids.setdefault(header[0].strip(), 0)
+    goals = set(ids.setdefault(goal.strip(), len(ids)) for goal in header[1].split(',') if goal.strip())
+
+    # Then the edges, in a tight loop as there may be millions
+    intern, internAction = ids.setdefault, actionIds.setdefault
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] == '#': continue
+        fields = line.split()
+        if len(fields) == 4:
+            src, action, dst, cost = fields
+            cost = float(cost)
+        elif len(fields) == 3:
+            src, action, dst = fields
+            cost = 1.0
+        else:
+            raise Exception('Invalid edge line: ' + line)
+        sources.append(intern(src, len(ids)))
+        edgeActions.append(internAction(action, len(actionIds)))
+        targets.append(intern(dst, len(ids)))
+        costs.append(cost)
+
+    names = [sys.intern(name) for name in sorted(ids, key=ids.get)]
+    actions = [sys.intern(action) for action in sorted(actionIds, key=actionIds.get)]
+
+    # Group the edges by source, keeping file order within a source
+    order = sorted(range(len(sources)), key=sources.__getitem__)
+    offsets = array('q', [0]) * (len(names) + 1)
+    for src in sources:
+        offsets[src + 1] += 1
+    for i in range(len(names)):
+        offsets[i + 1] += offsets[i]
+    return CSRGraph(names, actions, offsets, array('q', map(targets.__getitem__, order)),
+                    array('q', map(edgeActions.__getitem__, order)), array('d', map(costs.__getitem__, order)),
+                    start, goals)
+
+
+class CSRGraphProblem(SearchProblem):
+    """
+    A search problem on a CSRGraph.  States are node ids; graph.names maps
+    them back to the names in the file, and stateNames turns a list of them
+    into names.
+
+    Successors are read straight from the graph's arrays on each expansion
+    into the one list getSuccessors returns; nothing is kept per node
+    beyond the arrays themselves.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self.goals = graph.goals
+        self._expanded = 0
+
+    def getStartState(self):
+        return self.graph.start
+
+    def isGoalState(self, state):
+        return state in self.goals
+
+    def getSuccessors(self, state):
+        self._expanded += 1
+        graph = self.graph
+        actions, targets, actionIds, costs = graph.actions, graph.targets, graph.actionIds, graph.costs
+        return [(targets[e], actions[actionIds[e]], costs[e]) for e in graph.edges(state)]
+
+    def getCostOfActions(self, actions):
+        """
+        Returns the total cost of following actions from the start, where the
+        first edge with each action is taken.
+        """
+        graph = self.graph
+        state, total = graph.start, 0
+        for action in actions:
+            for e in graph.edges(state):
+                if graph.actions[graph.actionIds[e]] == action:
+                    state, total = graph.targets[e], total + graph.costs[e]
+                    break
+            else:
+                raise Exception('Invalid action %s from %s' % (action, self.graph.names[state]))
+        return total
+
+    def stateNames(self, states):
+        return [self.graph.names[state] for state in states]
+
+
+def read_csr_graph(filename, cache=None):
+    """
+    Reads a graph file into a CSRGraphProblem.
+
+    cache is an optional path for the binary form of the graph.  When the
+    cache is newer than the file it is mapped into memory instead of
+    parsing the file; otherwise the file is parsed and the cache written.
+    """
+    if cache != None and os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(filename):
+        return CSRGraphProblem(CSRGraph.load(cache))
+    with open(filename) as f:
+        graph = parse_csr_graph(f)
+    if cache != None:
+        graph.save(cache)
+    return CSRGraphProblem(graph)
+
+
 def test_create():
     graph = """
 # Graph files look like this:
@@ -111,6 +329,19 @@ def testDFS():
     problem = read_graph(filename='test_cases/extra/g1.txt')
     dfs(problem)
 
+def testCSR():
+    "Checks that read_csr_graph reads the test graphs as read_graph does."
+    for filename in ['test_cases/extra/g1.txt', 'test_cases/extra/g2.txt']:
+        problem = read_graph(filename=filename)
+        csr = read_csr_graph(filename)
+        names = csr.graph.names
+        assert names[csr.getStartState()] == problem.getStartState(), filename
+        assert set(csr.stateNames(csr.goals)) == problem.goals, filename
+        for i, name in enumerate(names):
+            assert [(names[dst], action, cost) for dst, action, cost in csr.getSuccessors(i)] == \
+                   problem.getSuccessors(name), (filename, name)
+        print('%s: %d nodes, %d edges read alike' % (filename, len(csr.graph), len(csr.graph.targets)))
+
 if __name__ == '__main__':
     #test_create()
     testDFS()
@@ -0,0 +1,156 @@
+"""
+All-pairs maze distances for a Pacman layout.
+
+Searching the maze every time a heuristic or evaluation function needs the
+distance between two points is slow.  A MazeDistanceOracle runs a single
+breadth-first search from every open cell of a walls Grid up front and keeps
+the results in one flat array, after which any maze distance is a lookup.
+
+Oracles are cached in memory by the contents of the walls, and can also be
+cached on disk:
+
+  oracle = MazeDistanceOracle.forWalls(gameState.getWalls(), cacheDir='.mazecache')
+  oracle.distance((1, 1), (5, 3))
+"""
+
+import hashlib
+import os
+import sys
+from array import array
+
+# Distance stored for pairs of cells with no path between them
+UNREACHABLE = 0xFFFF
+
+
+class MazeDistanceOracle:
+    """
+    The maze distance between every pair of open cells of a walls Grid.
+
+    Open cells are numbered in column order (the order of walls.asList(False))
+    and the distance from cell i to cell j is stored at i * n + j of an
+    unsigned 16-bit array, so an oracle for n open cells takes 2 * n * n bytes.
+    """
+
+    # Oracles built so far, by wallsKey
+    _cache = {}
+    # The walls Grid the last oracle was requested for, and that oracle
+    _last = (None, None)
+
+    def __init__(self, walls, distances=None):
+        """
+        Builds the oracle for a walls Grid.  distances, if given, is a
+        previously computed distance array for the same walls.
+        """
+        self.width, self.height = walls.width, walls.height
+        self.cells = walls.asList(False)
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+        if distances == None:
+            distances = self._allPairs(walls)
+        elif len(distances) != len(self.cells) ** 2:
+            raise ValueError('distance array does not match the walls')
+        self.distances = distances
+
+    @classmethod
+    def forWalls(cls, walls, cacheDir=None):
+        """
+        Returns the oracle for a walls Grid, building it only if no oracle for
+        the same walls is cached in memory, or in cacheDir when one is given.
+        """
+        lastWalls, lastOracle = cls._last
+        if walls is lastWalls: return lastOracle
+
+        key = wallsKey(walls)
+        oracle = cls._cache.get(key)
+        if oracle == None and cacheDir != None:
+            path = os.path.join(cacheDir, 'mazeDistances-%s.bin' % key)
+            if os.path.exists(path):
+                oracle = cls.load(walls, path)
+            else:
+                oracle = cls(walls)
+                oracle.save(path)
+        elif oracle == None:
+            oracle = cls(walls)
+
+        cls._cache[key] = oracle
+        cls._last = (walls, oracle)
+        return oracle
+
+    def distance(self, point1, point2):
+        """
+        Returns the maze distance between two open cells, or UNREACHABLE if
+        there is no path between them.
+        """
+        return self.distances[self.index[point1] * len(self.cells) + self.index[point2]]
+
+    def pathLength(self, point1, point2):
+        """
+        Returns the maze distance between two open cells, or 0 if there is no
+        path between them: the length of the empty plan a search returns.
+        """
+        distance = self.distance(point1, point2)
+        return 0 if distance == UNREACHABLE else distance
+
+    def distancesFrom(self, point):
+        "Returns a dictionary from every open cell to its distance from point."
+        n = len(self.cells)
+        start = self.index[point] * n
+        return dict(zip(self.cells, self.distances[start:start + n]))
+
+    def pathLengthsFrom(self, point):
+        "Returns a dictionary from every open cell to its pathLength from point."
+        return dict((cell, 0 if distance == UNREACHABLE else distance)
+                    for cell, distance in self.distancesFrom(point).items())
+
+    def _allPairs(self, walls):
+        "Runs a breadth-first search from every open cell."
+        index = self.index
+        neighbors = []
+        for x, y in self.cells:
+            neighbors.append([index[cell] for cell in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y))
+                              if cell in index])
+
+        n = len(self.cells)
+        distances = array('H', [UNREACHABLE]) * (n * n)
+        for source in range(n):
+            row = source * n
+            distances[row + source] = 0
+            frontier, depth = [source], 0
+            while frontier:
+                depth += 1
+                nextFrontier = []
+                for cell in frontier:
+                    for neighbor in neighbors[cell]:
+                        if distances[row + neighbor] == UNREACHABLE:
+                            distances[row + neighbor] = depth
+                            nextFrontier.append(neighbor)
+                frontier = nextFrontier
+        return distances
+
+    def save(self, path):
+        "Writes the distance array to path, creating its directory if needed."
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        distances = self.distances
+        if sys.byteorder != 'little':
+            distances = array('H', distances)
+            distances.byteswap()
+        with open(path, 'wb') as f:
+            distances.tofile(f)
+
+    @classmethod
+    def load(cls, walls, path):
+        "Reads an oracle for walls that was written by save."
+        distances = array('H')
+        with open(path, 'rb') as f:
+            distances.frombytes(f.read())
+        if sys.byteorder != 'little':
+            distances.byteswap()
+        return cls(walls, distances)
+
+
+def wallsKey(walls):
+    "Returns a hex digest identifying the size and contents of a walls Grid."
+    digest = hashlib.sha1(('%d %d\n' % (walls.width, walls.height)).encode())
+    digest.update(str(walls).encode())
+    return digest.hexdigest()
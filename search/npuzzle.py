@@ -0,0 +1,303 @@
+"""
+The N x N sliding tile puzzle (the 15-puzzle for N = 4, the 24-puzzle for
+N = 5), as a SearchProblem.
+
+This generalizes eightpuzzle.py.  A state packs the tiles into one int and
+carries its Manhattan distance and linear conflicts, which are updated as
+each move is made rather than recomputed, so the heuristics are lookups:
+
+> python npuzzle.py -n 4 -f idastar -H linearConflictHeuristic --seed 1
+"""
+
+import random
+
+import search
+
+# Moves of the blank: name and change in (row, col)
+MOVES = [('up', -1, 0), ('down', 1, 0), ('left', 0, -1), ('right', 0, 1)]
+
+# Move tables by puzzle size; see moveTable
+_moveTables = {}
+
+def moveTable(size):
+    """
+    For each cell the blank can be in (numbered row by row), a list of
+    (move, new blank cell) for the legal moves, in the order of MOVES.
+    """
+    if size not in _moveTables:
+        table = []
+        for blank in range(size * size):
+            row, col = divmod(blank, size)
+            table.append([(move, (row + dr) * size + col + dc) for move, dr, dc in MOVES
+                          if 0 <= row + dr < size and 0 <= col + dc < size])
+        _moveTables[size] = table
+    return _moveTables[size]
+
+# Conflict penalties by the goal positions of the tiles in a line, in order
+_lineConflicts = {}
+
+def lineConflict(goals):
+    """
+    Returns the linear conflict penalty of a line holding tiles that belong
+    in that line, given their goal positions along it in the current order.
+    Every tile outside the longest run already in goal order has to leave
+    the line and come back, two moves more than its Manhattan distance.
+    """
+    if goals not in _lineConflicts:
+        # Longest increasing subsequence, by patience sorting
+        piles = []
+        for goal in goals:
+            for i, top in enumerate(piles):
+                if goal < top:
+                    piles[i] = goal
+                    break
+            else:
+                piles.append(goal)
+        _lineConflicts[goals] = 2 * (len(goals) - len(piles))
+    return _lineConflicts[goals]
+
+
+class NPuzzleState:
+    """
+    An N x N sliding puzzle.  Tiles are numbered 1 to N*N - 1 and 0 is the
+    blank; the goal has the blank in the top left and the tiles in order:
+
+      -----------------
+      |   | 1 | 2 | 3 |
+      -----------------
+      | 4 | 5 | 6 | 7 |
+      ...
+
+    The tiles are packed row by row into the int 'board', 'bits' bits each.
+    'manhattan' is the sum of the tiles' Manhattan distances to their goal
+    cells, and 'conflicts' holds the linear conflict penalty of each row
+    and then each column.
+    """
+    __slots__ = ('size', 'bits', 'board', 'blank', 'manhattan', 'conflicts')
+
+    def __init__(self, numbers, size=None):
+        """
+        numbers: the tiles row by row, with 0 for the blank, e.g.
+          [1, 0, 2, 3, 4, 5, 6, 7, 8] for the 3 x 3 puzzle one move from the goal.
+        """
+        numbers = list(numbers)
+        if size == None:
+            size = int(round(len(numbers) ** 0.5))
+        if sorted(numbers) != list(range(size * size)):
+            raise Exception('An %d x %d puzzle needs each of 0 to %d once' % (size, size, size * size - 1))
+        self.size = size
+        self.bits = (size * size - 1).bit_length()
+        self.board = 0
+        for i, number in enumerate(numbers):
+            self.board |= number << (self.bits * i)
+        self.blank = numbers.index(0)
+
+        self.manhattan = 0
+        for i, number in enumerate(numbers):
+            if number != 0:
+                self.manhattan += abs(i // size - number // size) + abs(i % size - number % size)
+        self.conflicts = tuple([self._rowConflict(row) for row in range(size)] +
+                               [self._columnConflict(col) for col in range(size)])
+
+    def _tiles(self, cells):
+        "Returns the tiles in a sequence of cells."
+        board, bits = self.board, self.bits
+        mask = (1 << bits) - 1
+        return [(board >> (bits * cell)) & mask for cell in cells]
+
+    def _rowConflict(self, row):
+        size = self.size
+        return lineConflict(tuple(tile % size for tile in self._tiles(range(row * size, (row + 1) * size))
+                                  if tile != 0 and tile // size == row))
+
+    def _columnConflict(self, col):
+        size = self.size
+        return lineConflict(tuple(tile // size for tile in self._tiles(range(col, size * size, size))
+                                  if tile != 0 and tile % size == col))
+
+    def numbers(self):
+        "Returns the tiles row by row, with 0 for the blank."
+        return self._tiles(range(self.size * self.size))
+
+    @property
+    def cells(self):
+        "The puzzle as a list of rows."
+        numbers = self.numbers()
+        return [numbers[row * self.size:(row + 1) * self.size] for row in range(self.size)]
+
+    def isGoal(self):
+        return self.manhattan == 0
+
+    def linearConflict(self):
+        return sum(self.conflicts)
+
+    def legalMoves(self):
+        "Returns the legal moves of the blank: 'up', 'down', 'left' or 'right'."
+        return [move for move, _ in moveTable(self.size)[self.blank]]
+
+    def successors(self):
+        "Returns (puzzle, move) for every legal move."
+        return [(self._slide(newBlank), move) for move, newBlank in moveTable(self.size)[self.blank]]
+
+    def result(self, move):
+        "Returns a new puzzle with the blank moved; this puzzle is unchanged."
+        for name, newBlank in moveTable(self.size)[self.blank]:
+            if name == move: return self._slide(newBlank)
+        raise Exception('Illegal move: ' + str(move))
+
+    def _slide(self, newBlank):
+        "Returns the puzzle after the tile at newBlank slides into the blank."
+        size, bits, blank = self.size, self.bits, self.blank
+        shift = bits * newBlank
+        tile = (self.board >> shift) & ((1 << bits) - 1)
+
+        puzzle = NPuzzleState.__new__(NPuzzleState)
+        puzzle.size, puzzle.bits, puzzle.blank = size, bits, newBlank
+        puzzle.board = self.board & ~(((1 << bits) - 1) << shift) | (tile << (bits * blank))
+
+        # Only the moving tile's distance changes, by one
+        goalRow, goalCol = divmod(tile, size)
+        fromRow, fromCol = divmod(newBlank, size)
+        toRow, toCol = divmod(blank, size)
+        puzzle.manhattan = self.manhattan - abs(fromRow - goalRow) - abs(fromCol - goalCol) \
+                                          + abs(toRow - goalRow) + abs(toCol - goalCol)
+
+        # The tile keeps its place among the others in the line it moves
+        # along, so only the two lines it leaves and joins change; and those
+        # only if one of them is its goal line
+        conflicts = self.conflicts
+        if fromRow != toRow and goalRow in (fromRow, toRow):
+            conflicts = conflicts[:goalRow] + (puzzle._rowConflict(goalRow),) + conflicts[goalRow + 1:]
+        elif fromCol != toCol and goalCol in (fromCol, toCol):
+            line = size + goalCol
+            conflicts = conflicts[:line] + (puzzle._columnConflict(goalCol),) + conflicts[line + 1:]
+        puzzle.conflicts = conflicts
+        return puzzle
+
+    def __eq__(self, other):
+        return isinstance(other, NPuzzleState) and self.size == other.size and self.board == other.board
+
+    def __hash__(self):
+        return hash(self.board)
+
+    def __str__(self):
+        width = len(str(self.size * self.size - 1))
+        horizontalLine = '-' * ((width + 3) * self.size + 1)
+        lines = [horizontalLine]
+        for row in self.cells:
+            lines.append('|' + ''.join(' %s |' % (str(number) if number else '').rjust(width) for number in row))
+            lines.append(horizontalLine)
+        return '\n'.join(lines)
+
+
+def isSolvable(numbers, size=None):
+    """
+    Returns whether the goal can be reached from the tiles row by row.
+
+    Each move swaps the blank with a tile, flipping the parity of the
+    permutation of all N*N cells, and moves the blank one cell, flipping the
+    parity of its row plus column.  The goal has both even, so a puzzle is
+    solvable exactly when the two parities agree.
+    """
+    numbers = list(numbers)
+    if size == None:
+        size = int(round(len(numbers) ** 0.5))
+    # Permutation parity from its cycle count
+    seen = [False] * len(numbers)
+    transpositions = 0
+    for start in range(len(numbers)):
+        length, i = 0, start
+        while not seen[i]:
+            seen[i] = True
+            i = numbers[i]
+            length += 1
+        transpositions += max(0, length - 1)
+    row, col = divmod(numbers.index(0), size)
+    return transpositions % 2 == (row + col) % 2
+
+def randomNPuzzle(size, rng=random):
+    """
+    Returns a puzzle drawn uniformly from the solvable size x size puzzles:
+    a random shuffle, with two tiles swapped if that made it unsolvable.
+    """
+    numbers = list(range(size * size))
+    rng.shuffle(numbers)
+    if not isSolvable(numbers, size):
+        first, second = [i for i, number in enumerate(numbers) if number != 0][:2]
+        numbers[first], numbers[second] = numbers[second], numbers[first]
+    return NPuzzleState(numbers, size)
+
+
+class NPuzzleSearchProblem(search.SearchProblem):
+    "The search problem of solving an NPuzzleState; every move costs 1."
+
+    def __init__(self, puzzle):
+        if not isSolvable(puzzle.numbers(), puzzle.size):
+            raise Exception('This puzzle cannot be solved')
+        self.puzzle = puzzle
+        self._expanded = 0
+
+    def getStartState(self):
+        return self.puzzle
+
+    def isGoalState(self, state):
+        return state.isGoal()
+
+    def getSuccessors(self, state):
+        self._expanded += 1
+        return [(successor, move, 1) for successor, move in state.successors()]
+
+    def getCostOfActions(self, actions):
+        return len(actions)
+
+def manhattanPuzzleHeuristic(state, problem=None):
+    "The sum of the tiles' Manhattan distances to their goal cells."
+    return state.manhattan
+
+def linearConflictHeuristic(state, problem=None):
+    """
+    Manhattan distance plus two moves for each tile that has to leave its
+    goal row or column to get around another tile.  Admissible and consistent.
+    """
+    return state.manhattan + sum(state.conflicts)
+
+
+def readCommand(argv):
+    "Processes the command used to solve a random puzzle."
+    from optparse import OptionParser
+    usageStr = """
+    USAGE:      python npuzzle.py <options>
+    EXAMPLES:   (1) python npuzzle.py
+                    - solves a random 8-puzzle with A* and linear conflicts
+                (2) python npuzzle.py -n 4 -f idastar --seed 1
+                    - solves a random 15-puzzle with IDA*
+    """
+    parser = OptionParser(usageStr)
+    parser.add_option('-n', '--size', dest='size', type='int', default=3,
+                      help='the width of the puzzle (default %default)')
+    parser.add_option('-f', '--function', dest='function', default='astar',
+                      help='the search function in search.py (default %default)')
+    parser.add_option('-H', '--heuristic', dest='heuristic', default='linearConflictHeuristic',
+                      help='manhattanPuzzleHeuristic or linearConflictHeuristic (default %default)')
+    parser.add_option('--seed', dest='seed', type='int', default=None,
+                      help='the random seed for the puzzle')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    import sys
+    import time
+    options = readCommand(sys.argv[1:])
+    puzzle = randomNPuzzle(options.size, random.Random(options.seed))
+    print('A random puzzle:')
+    print(puzzle)
+
+    problem = NPuzzleSearchProblem(puzzle)
+    function = getattr(search, options.function)
+    heuristic = globals()[options.heuristic]
+    start = time.time()
+    path = function(problem, heuristic=heuristic)
+    print('%s found a path of %d moves in %.1f seconds, expanding %d nodes: %s' %
+          (function.__name__, len(path), time.time() - start, problem._expanded, ' '.join(path)))
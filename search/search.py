@@ -18,6 +18,10 @@ Pacman agents (in searchAgents.py).
 """
 
 import util
+import collections
+import heapq
+import time
+from array import array
 
 class SearchProblem:
     """
@@ -61,6 +65,66 @@ class SearchProblem:
         """
         util.raiseNotDefined()
 
+    def getGoalState(self):
+        """
+        Optional: returns the single goal state of the problem.  Only needed
+        by searches that work backwards from the goal (bidirectionalSearch).
+        """
+        util.raiseNotDefined()
+
+    def getPredecessors(self, state):
+        """
+          state: Search state
+
+        Optional: the reverse of getSuccessors, needed by searches that work
+        backwards from the goal (bidirectionalSearch).  Returns a list of
+        triples, (predecessor, action, stepCost), where 'action' leads from
+        'predecessor' to 'state' at a cost of 'stepCost'.
+        """
+        util.raiseNotDefined()
+
+
+class SearchNodes:
+    """
+    A table of the search nodes generated during a single search.
+
+    Nodes are integer ids.  The state, parent id, action and path cost of
+    each node live in parallel arrays, so a fringe only has to hold ids and
+    generating a successor costs O(1) instead of copying the whole path.
+    The plan is rebuilt once, by following parent ids back from the goal.
+    """
+    __slots__ = ('states', 'parents', 'actions', 'costs')
+
+    def __init__(self):
+        self.states = []
+        self.parents = array('l')
+        self.actions = []
+        self.costs = []
+
+    def add(self, state, parent=-1, action=None, cost=0):
+        """
+        Stores a new node and returns its id.  The root node has no parent
+        (parent id -1) and no action.
+        """
+        self.states.append(state)
+        self.parents.append(parent)
+        self.actions.append(action)
+        self.costs.append(cost)
+        return len(self.states) - 1
+
+    def path(self, node):
+        "Returns the list of actions leading from the root to the given node."
+        parents, actions = self.parents, self.actions
+        path = []
+        while parents[node] >= 0:
+            path.append(actions[node])
+            node = parents[node]
+        path.reverse()
+        return path
+
+    def __len__(self):
+        return len(self.states)
+
 
 def tinyMazeSearch(problem: SearchProblem):
     """
@@ -80,28 +144,31 @@ def depthFirstSearch(problem: SearchProblem):
     # Keep track of visited nodes
     visited = set()
 
+    # Store the nodes generated so far; the fringe only holds node ids
+    nodes = SearchNodes()
+
     # Store states to explore
     stack = util.Stack()
-    stack.push((problem.getStartState(), []))
+    stack.push(nodes.add(problem.getStartState()))
 
     while stack:
 
-        # Get the top state and action in the stack
-        state, actions = stack.pop()
+        # Get the top node in the stack
+        node = stack.pop()
+        state = nodes.states[node]
 
         # Return if we have reached the goal
         if problem.isGoalState(state):
-            return actions
+            return nodes.path(node)
 
         # Check unvisited states
         if state not in visited:
             visited.add(state)
 
-            # Add successors and actions to the stack
-            for successor, action, _ in problem.getSuccessors(state):
-                if successor not in visited:
-                    new_actions = actions + [action]
-                    stack.push((successor, new_actions))
+            # Add successors to the stack
+            stack.extend(nodes.add(successor, node, action)
+                         for successor, action, _ in problem.getSuccessors(state)
+                         if successor not in visited)
 
     # No solution found
     return []
@@ -113,15 +180,19 @@ def breadthFirstSearch(problem: SearchProblem):
 
     # Keep track of visited nodes
     visited = set()
+
+    # Store the nodes generated so far; the fringe only holds node ids
+    nodes = SearchNodes()
     
     # Store states to explore
     queue = util.Queue()
-    queue.push((problem.getStartState(), []))
+    queue.push(nodes.add(problem.getStartState()))
 
     while not queue.isEmpty():
 
-        # Get the next state and path
-        state, actions = queue.pop()
+        # Get the next node
+        node = queue.pop()
+        state = nodes.states[node]
 
         # Skip if state has been visited
         if state in visited: continue  
@@ -131,47 +202,55 @@ def breadthFirstSearch(problem: SearchProblem):
 
         # Return if we have reached the goal
         if problem.isGoalState(state):
-            return actions  
-
-        for successor, action, _ in problem.getSuccessors(state):
-            if successor not in visited:
+            return nodes.path(node)
 
-                # Push the successor and the updated path to the queue
-                queue.push((successor, actions + [action]))
+        # Push the successor nodes to the queue
+        queue.extend(nodes.add(successor, node, action)
+                     for successor, action, _ in problem.getSuccessors(state)
+                     if successor not in visited)
 
     # No solution found
     return []
 
-def uniformCostSearch(problem: SearchProblem):
-    """Search the node of least total cost first."""
+def uniformCostSearch(problem: SearchProblem, decreaseKey=False):
+    """
+    Search the node of least total cost first.
+
+    With decreaseKey=True the fringe keeps at most one entry per state (see
+    decreaseKeySearch) instead of pushing duplicates and skipping them later.
+    """
+    if decreaseKey: return decreaseKeySearch(problem)
 
     # Keep track of visited nodes
     visited = set()
 
+    # Store the nodes generated so far; the fringe only holds node ids
+    nodes = SearchNodes()
+
     # Store states to explore
     queue = util.PriorityQueue()
-    queue.push((problem.getStartState(), [], 0), 0)
+    queue.push(nodes.add(problem.getStartState()), 0)
 
     while not queue.isEmpty():
 
-        state, actions, cost = queue.pop()
+        node = queue.pop()
+        state, cost = nodes.states[node], nodes.costs[node]
 
         # Skip if state has been visited
         if state in visited: continue
         visited.add(state)
 
         # Return if we have reached the goal
-        if problem.isGoalState(state): return actions
+        if problem.isGoalState(state): return nodes.path(node)
 
-        # Add successors and actions to the queue
+        # Add successors to the queue
         for successor, action, stepCost in problem.getSuccessors(state):
 
             if successor not in visited:
 
-                # Push the successor and the updated path to the queue
-                new_actions = actions + [action]
+                # Push the successor node to the queue
                 new_cost = cost + stepCost
-                queue.push((successor, new_actions, new_cost), new_cost)
+                queue.push(nodes.add(successor, node, action, new_cost), new_cost)
 
     return []
 
@@ -182,42 +261,1205 @@ def nullHeuristic(state, problem=None):
     """
     return 0
 
-def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
+
+class CachedHeuristic:
+    """
+    Wraps a heuristic with a cache of its values, keyed on the state, which
+    keeps the maxSize most recently used states.  Searches that push a state
+    more than once (aStarSearch pushes every path it finds to a state) then
+    compute its heuristic only the first time.  The cache is emptied when
+    the heuristic is used on a different problem.
+
+      heuristic = search.CachedHeuristic(foodHeuristic)
+      search.aStarSearch(problem, heuristic)
+      print(heuristic.hits, heuristic.misses)
+
+    With check=True the heuristic is also tested as the search runs, by
+    any search: each time a state's heuristic is computed, it is checked to
+    be 0 if the state is a goal and consistent, h(n) <= c(n, n') + h(n'),
+    across every edge out of the state.  A heuristic that passes both is
+    admissible as well.  checkPlan can afterwards check that no state on a
+    plan has a heuristic above the cost left to the goal along it.  Each
+    violation is kept in violations and the first reportLimit are printed.
+
+    The checks ask the problem for successors the search may never expand
+    (without adding to the problem's _expanded count) and compute the
+    heuristic of each, outside the cache, so check mode is for debugging.
+    """
+
+    def __init__(self, heuristic, maxSize=100000, check=False, reportLimit=10):
+        self.heuristic = heuristic
+        self.__name__ = getattr(heuristic, '__name__', 'heuristic')
+        self.maxSize = int(maxSize)
+        self.check = check
+        self.reportLimit = reportLimit
+        self.cache = collections.OrderedDict()
+        self.problem = None
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        self.violations = []
+
+    def __call__(self, state, problem=None):
+        if state in self.cache and problem is self.problem:
+            self.hits += 1
+            self.cache.move_to_end(state)
+            return self.cache[state]
+        self.misses += 1
+        if problem is not self.problem:
+            self.cache.clear()
+            self.problem = problem
+        value = self.cache[state] = self.heuristic(state, problem)
+        if len(self.cache) > self.maxSize:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        if self.check and problem != None:
+            self.checkState(state, problem)
+        return value
+
+    def _value(self, state, problem):
+        "Returns the heuristic of state for the checks, leaving the cache as it is."
+        if state in self.cache and problem is self.problem: return self.cache[state]
+        return self.heuristic(state, problem)
+
+    def hitRate(self):
+        "Returns the fraction of calls answered from the cache, or None before any call."
+        calls = self.hits + self.misses
+        if calls == 0: return None
+        return self.hits / calls
+
+    def checkState(self, state, problem):
+        "Records a violation if the heuristic is not 0 at a goal or not consistent out of state."
+        h = self._value(state, problem)
+        if h != 0 and problem.isGoalState(state):
+            self._violation('inadmissible: h(%s) = %s at a goal' % (state, h))
+        for successor, action, stepCost in self._successors(state, problem):
+            self.checkEdge(state, successor, stepCost, problem)
+
+    def _successors(self, state, problem):
+        "Returns the successors of state without counting an expansion."
+        expanded = getattr(problem, '_expanded', None)
+        successors = problem.getSuccessors(state)
+        if expanded != None: problem._expanded = expanded
+        return successors
+
+    def checkEdge(self, state, successor, stepCost, problem):
+        "Records a violation if the heuristic is not consistent across this edge."
+        if not self.check: return
+        h, successorH = self._value(state, problem), self._value(successor, problem)
+        if h > stepCost + successorH:
+            self._violation('inconsistent: h(%s) = %s > %s + h(%s) = %s' %
+                            (state, h, stepCost, successor, stepCost + successorH))
+
+    def checkPlan(self, problem, actions):
+        """
+        Records a violation for each state on the plan whose heuristic is
+        above the cost of the rest of the plan.
+        """
+        if not self.check or actions == None: return
+        states, costs = [problem.getStartState()], [0]
+        for action in actions:
+            for successor, successorAction, stepCost in self._successors(states[-1], problem):
+                if successorAction == action:
+                    states.append(successor)
+                    costs.append(costs[-1] + stepCost)
+                    break
+            else:
+                return
+        for state, cost in zip(states, costs):
+            h = self._value(state, problem)
+            if h > costs[-1] - cost:
+                self._violation('inadmissible on the plan: h(%s) = %s > %s left' % (state, h, costs[-1] - cost))
+
+    def _violation(self, message):
+        self.violations.append(message)
+        if len(self.violations) <= self.reportLimit:
+            print('*** Heuristic %s %s' % (self.__name__, message))
+
+def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic, decreaseKey=False):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    With decreaseKey=True the fringe keeps at most one entry per state (see
+    decreaseKeySearch) instead of pushing duplicates and skipping them later.
+    """
+    if decreaseKey: return decreaseKeySearch(problem, heuristic)
 
     # Keep track of visited nodes
     visited = set()
 
+    # Store the nodes generated so far; the fringe only holds node ids
+    nodes = SearchNodes()
+
     # Store states to explore
     queue = util.PriorityQueue()
-    queue.push((problem.getStartState(), [], 0), 0)
+    queue.push(nodes.add(problem.getStartState()), 0)
 
     while not queue.isEmpty():
 
-        state, actions, cost = queue.pop()
+        node = queue.pop()
+        state, cost = nodes.states[node], nodes.costs[node]
 
         # Skip if state has been visited
         if state in visited: continue
         visited.add(state)
 
         # Return if we have reached the goal
-        if problem.isGoalState(state): return actions
+        if problem.isGoalState(state): return nodes.path(node)
 
-        # Add successors and actions to the queue
+        # Add successors to the queue
         for successor, action, stepCost in problem.getSuccessors(state):
 
             if successor not in visited:
 
-                # Push the successor and the updated path to the queue
-                new_actions = actions + [action]
+                # Push the successor node to the queue
                 new_cost = cost + stepCost
-                queue.push((successor, new_actions, new_cost), new_cost + heuristic(successor, problem))
+                queue.push(nodes.add(successor, node, action, new_cost), new_cost + heuristic(successor, problem))
 
     return []
 
+def decreaseKeySearch(problem: SearchProblem, heuristic=nullHeuristic):
+    """
+    A* (or UCS, with the null heuristic) over an indexed priority queue.
+
+    Instead of pushing a new fringe entry every time a cheaper path to a state
+    is found, the state's existing entry has its priority lowered in place, so
+    the fringe never holds more than one entry per state and the heuristic is
+    evaluated once per state.  States are expanded in the same order as
+    aStarSearch.
+    """
+
+    # Keep track of expanded states
+    closed = set()
+
+    # Store the nodes generated so far and the fringe node of each state
+    nodes = SearchNodes()
+    fringeNodes = {}
+    heuristics = {}
+
+    # Store states to explore
+    start = problem.getStartState()
+    queue = util.IndexedPriorityQueue()
+    queue.push(start, 0)
+    fringeNodes[start] = nodes.add(start)
+
+    while not queue.isEmpty():
+
+        state = queue.pop()
+        node = fringeNodes.pop(state)
+        heuristics.pop(state, None)
+        closed.add(state)
+
+        # Return if we have reached the goal
+        if problem.isGoalState(state): return nodes.path(node)
+
+        # Add successors to the queue, or lower their priority
+        cost = nodes.costs[node]
+        for successor, action, stepCost in problem.getSuccessors(state):
+
+            if successor in closed: continue
+
+            new_cost = cost + stepCost
+            if successor in fringeNodes:
+                if new_cost >= nodes.costs[fringeNodes[successor]]: continue
+                fringeNodes[successor] = nodes.add(successor, node, action, new_cost)
+                queue.decreaseKey(successor, new_cost + heuristics[successor])
+            else:
+                h = heuristics[successor] = heuristic(successor, problem)
+                fringeNodes[successor] = nodes.add(successor, node, action, new_cost)
+                queue.push(successor, new_cost + h)
+
+    return []
+
+def iterativeDeepeningAStarSearch(problem: SearchProblem, heuristic=nullHeuristic):
+    """
+    Iterative-deepening A* (IDA*).
+
+    Runs a series of depth-first searches, each exploring every path whose
+    f = g + h is within a bound, and raises the bound to the smallest f that
+    was cut off until a goal is found.  Only the current path is kept in
+    memory, so it fits problems too large for aStarSearch, at the price of
+    re-expanding states.  Returns an optimal plan for an admissible heuristic.
+
+    The longest path held in memory is stored in problem._peakNodes.
+    """
+    start = problem.getStartState()
+    problem._peakNodes = 1
+    if problem.isGoalState(start): return []
+
+    bound = heuristic(start, problem)
+    while True:
+
+        # The current path, and an iterator over the successors left to try
+        # at each state on it
+        path, onPath, actions, costs = [start], {start}, [], [0]
+        successors = [iter(problem.getSuccessors(start))]
+        nextBound = float('inf')
+
+        while successors:
+            for successor, action, stepCost in successors[-1]:
+                if successor in onPath: continue
+
+                # Cut off paths beyond the bound, remembering the next bound
+                cost = costs[-1] + stepCost
+                f = cost + heuristic(successor, problem)
+                if f > bound:
+                    nextBound = min(nextBound, f)
+                    continue
+
+                if problem.isGoalState(successor): return actions + [action]
+
+                # Go one step deeper
+                path.append(successor)
+                onPath.add(successor)
+                actions.append(action)
+                costs.append(cost)
+                successors.append(iter(problem.getSuccessors(successor)))
+                problem._peakNodes = max(problem._peakNodes, len(path))
+                break
+            else:
+                # Every successor has been tried, so backtrack
+                successors.pop()
+                onPath.discard(path.pop())
+                costs.pop()
+                if actions: actions.pop()
+
+        # No solution at any bound
+        if nextBound == float('inf'): return []
+        bound = nextBound
+
+class _MemoryNode:
+    "A node of the search tree kept in memory by smaStarSearch."
+    __slots__ = ('state', 'parent', 'index', 'action', 'cost', 'f', 'depth',
+                 'children', 'forgotten', 'expanded', 'stamp')
+
+    def __init__(self, state, parent, index, action, cost, f, depth):
+        self.state = state
+        self.parent = parent        # None for the root
+        self.index = index          # position among the parent's successors
+        self.action = action
+        self.cost = cost
+        self.f = f
+        self.depth = depth
+        self.children = {}          # successor index -> child in memory
+        self.forgotten = float('inf') # lowest f of any child dropped from memory
+        self.expanded = False
+        self.stamp = -1             # id of the node's live fringe entries, -1 if none
+
+    def key(self):
+        """
+        The node's fringe priority: its own f until it is expanded, then the
+        lowest f of its forgotten children, which must be generated again.
+        """
+        return self.forgotten if self.expanded else self.f
+
+def smaStarSearch(problem: SearchProblem, heuristic=nullHeuristic, maxNodes=100000):
+    """
+    Simplified memory-bounded A* (SMA*).
+
+    Works like A* on the search tree, but never keeps more than maxNodes
+    nodes in memory.  When memory is full the worst leaf (highest f, then
+    shallowest) is forgotten and its f is backed up into its parent, which
+    will generate the forgotten children again if the search comes back to
+    it.  Returns an optimal plan for an admissible heuristic as long as
+    maxNodes is large enough to hold an optimal path; paths longer than that
+    are treated as dead ends.
+
+    Successors that repeat a state on the path to them, or a state already
+    in memory at no greater cost, are not added: the search only keeps the
+    cheapest path it knows to each state in memory, as a graph search
+    would.  A dropped successor is generated again whenever its parent is,
+    so nothing is lost when the cheaper copy is forgotten later.  When
+    maxNodes cannot hold an optimal path the search still tries every path
+    that fits before giving up, which can take very long; with that little
+    memory use iterativeDeepeningAStarSearch instead.
+
+    Memory is checked after each expansion, so the tree can briefly exceed
+    maxNodes by the successors of one node.  The peak number of nodes in
+    memory is stored in problem._peakNodes.
+    """
+    maxNodes = int(maxNodes)
+    inf = float('inf')
+    start = problem.getStartState()
+    root = _MemoryNode(start, None, None, None, 0, heuristic(start, problem), 0)
+
+    # Fringe entries are shared by a best-first and a worst-first heap, and
+    # only the most recent ones pushed for a node (its stamp) are valid
+    best, worst = [], []
+    counter = [0]
+    def enqueue(node):
+        key, stamp = node.key(), counter[0]
+        counter[0] += 1
+        node.stamp = stamp
+        heapq.heappush(best, (key, -node.depth, stamp, node))
+        heapq.heappush(worst, (-key, node.depth, stamp, node))
+
+    # The cheapest node in memory for each state
+    inMemory = {start: root}
+
+    used = problem._peakNodes = 1
+    def forget(node):
+        "Drops a leaf from memory and backs its f up into its parent."
+        nonlocal used
+        while node is not root:
+            node.stamp = -1
+            parent = node.parent
+            del parent.children[node.index]
+            if inMemory.get(node.state) is node: del inMemory[node.state]
+            used -= 1
+            parent.forgotten = min(parent.forgotten, node.key())
+            if parent.forgotten < inf:
+                enqueue(parent)
+                return
+            # Every child of the parent was a dead end
+            if parent.children: return
+            node = parent
+        root.stamp = -1
+
+    enqueue(root)
+    while best:
+        key, _, stamp, node = heapq.heappop(best)
+        if stamp != node.stamp: continue
+        node.stamp = -1
+        if key == inf: break
+
+        if node.expanded:
+            # Generate the children that were forgotten again
+            lower, node.forgotten = node.forgotten, inf
+        else:
+            if problem.isGoalState(node.state):
+                actions = []
+                while node.parent != None:
+                    actions.append(node.action)
+                    node = node.parent
+                actions.reverse()
+                return actions
+            lower, node.expanded = node.f, True
+
+        # States on the path to the node are not regenerated
+        ancestors, ancestor = set(), node
+        while ancestor != None:
+            ancestors.add(ancestor.state)
+            ancestor = ancestor.parent
+
+        depth = node.depth + 1
+        for index, (successor, action, stepCost) in enumerate(problem.getSuccessors(node.state)):
+            if index in node.children or successor in ancestors: continue
+            cost = node.cost + stepCost
+            known = inMemory.get(successor)
+            if known != None and known.cost <= cost: continue
+            if depth < maxNodes - 1 or problem.isGoalState(successor):
+                f = max(lower, cost + heuristic(successor, problem))
+            else:
+                f = inf
+            child = _MemoryNode(successor, node, index, action, cost, f, depth)
+            node.children[index] = child
+            inMemory[successor] = child
+            used += 1
+            enqueue(child)
+        problem._peakNodes = max(problem._peakNodes, used)
+
+        # A node without successors is a dead end
+        if not node.children and node.forgotten == inf:
+            forget(node)
+
+        # Forget the worst leaves until the tree fits in memory again
+        while used > maxNodes and worst:
+            _, _, stamp, leaf = heapq.heappop(worst)
+            if stamp == leaf.stamp and not leaf.children and leaf is not root:
+                forget(leaf)
+
+    return []
+
+def anytimeAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, timeLimit=None, weight=3.0, weightStep=0.5):
+    """
+    Anytime repairing A* (ARA*).
+
+    Searches with f = g + weight * h, which finds a plan costing at most
+    weight times the optimum quickly, then lowers the weight by weightStep
+    and repairs the search to improve the plan, reusing the work already
+    done, until the weight reaches 1 and the plan is optimal (for an
+    admissible heuristic) or timeLimit seconds have passed.  The best plan
+    found is returned; the time limit only stops the search once there is a
+    plan to return.
+
+    After each iteration the best plan so far is recorded in
+    problem._anytimePlans as (seconds, cost, bound), where bound is a proven
+    limit on cost / optimal cost, and the bound of the plan returned is
+    stored in problem._suboptimalityBound.
+    """
+    timeLimit = float(timeLimit) if timeLimit != None else None
+    weight, weightStep = float(weight), float(weightStep)
+    startTime = time.time()
+    inf = float('inf')
+
+    start = problem.getStartState()
+    problem._anytimePlans = []
+    problem._suboptimalityBound = 1.0
+    if problem.isGoalState(start): return []
+
+    heuristics = {}
+    def h(state):
+        if state not in heuristics:
+            heuristics[state] = heuristic(state, problem)
+        return heuristics[state]
+
+    # The node with the lowest cost found so far for each state
+    nodes = SearchNodes()
+    best = {start: nodes.add(start)}
+    costs = nodes.costs
+
+    # OPEN holds the states to expand in this iteration, CLOSED those already
+    # expanded in it, and INCONS closed states whose cost has since dropped,
+    # which wait for the next iteration.  Queue entries for a state are stale
+    # once it leaves OPEN or a cheaper node replaces it
+    opened, closed, inconsistent = {start}, set(), set()
+    goalNode, goalCost = None, inf
+    provenWeight = inf
+
+    def rebuildQueue():
+        queue = util.PriorityQueue()
+        queue.extend((best[state], costs[best[state]] + weight * h(state)) for state in opened)
+        return queue
+    queue = rebuildQueue()
+
+    while True:
+        # Improve the path: expand states with f below the current plan's cost
+        timedOut = False
+        while queue:
+            node = queue.peek()
+            state = nodes.states[node]
+            if state not in opened or best[state] != node:
+                queue.pop()
+                continue
+            if costs[node] + weight * h(state) >= goalCost: break
+            if timeLimit != None and goalNode != None and time.time() - startTime > timeLimit:
+                timedOut = True
+                break
+            queue.pop()
+            opened.remove(state)
+            closed.add(state)
+
+            for successor, action, stepCost in problem.getSuccessors(state):
+                new_cost = costs[node] + stepCost
+                if successor in best and new_cost >= costs[best[successor]]: continue
+                child = best[successor] = nodes.add(successor, node, action, new_cost)
+                if new_cost < goalCost and problem.isGoalState(successor):
+                    goalNode, goalCost = child, new_cost
+                if successor in closed:
+                    inconsistent.add(successor)
+                else:
+                    opened.add(successor)
+                    queue.push(child, new_cost + weight * h(successor))
+
+        if goalNode == None: return []
+
+        # A finished iteration proves its weight as a bound, and every cheaper
+        # plan passes through a state in OPEN or INCONS
+        if not timedOut: provenWeight = weight
+        lowest = min([costs[best[state]] + h(state) for state in opened | inconsistent] or [goalCost])
+        bound = min(provenWeight, goalCost / lowest) if lowest > 0 else provenWeight
+        bound = max(bound, 1.0)
+        problem._anytimePlans.append((time.time() - startTime, goalCost, bound))
+        problem._suboptimalityBound = bound
+
+        if bound <= 1.0 or timedOut: break
+        if timeLimit != None and time.time() - startTime > timeLimit: break
+
+        # Lower the weight and start the next iteration from OPEN and INCONS
+        weight = max(1.0, weight - weightStep)
+        opened |= inconsistent
+        inconsistent, closed = set(), set()
+        queue = rebuildQueue()
+
+    return nodes.path(goalNode)
+
+
+class _ReversedProblem:
+    """
+    A view of a problem with its start and goal swapped, so that a heuristic
+    written for the problem (e.g. one that reads problem.goal) estimates the
+    distance back to the start instead.  Everything else is delegated.
+    """
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def getStartState(self):
+        return self.problem.getGoalState()
+
+    def getGoalState(self):
+        return self.goal
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        return self.problem.getPredecessors(state)
+
+    def getPredecessors(self, state):
+        return self.problem.getSuccessors(state)
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+def bidirectionalSearch(problem: SearchProblem, heuristic=None):
+    """
+    Search forwards from the start and backwards from the goal at the same
+    time, until the two searches have met on a least-cost path.
+
+    The problem must have a single goal state (getGoalState) and must be able
+    to list the predecessors of a state (getPredecessors).  Without a
+    heuristic this is bidirectional uniform cost search, i.e. bidirectional
+    BFS when every step costs 1.  With one, both directions are ordered by
+    half the difference between the heuristic towards the goal and the same
+    heuristic aimed back at the start, which keeps the result optimal for
+    consistent heuristics.
+    """
+    start, goal = problem.getStartState(), problem.getGoalState()
+    if start == goal: return []
+
+    # Potential of each state: 0 without a heuristic, otherwise the average
+    # of the forward heuristic and the negated backward heuristic
+    potentials = {}
+    if heuristic in (None, nullHeuristic):
+        potential = lambda state: 0
+    else:
+        backward = _ReversedProblem(problem)
+        def potential(state):
+            if state not in potentials:
+                potentials[state] = (heuristic(state, problem) - heuristic(state, backward)) / 2
+            return potentials[state]
+
+    # One of everything per direction; index 0 searches forwards, 1 backwards
+    expand = (problem.getSuccessors, problem.getPredecessors)
+    sign = (1, -1)
+    nodes = (SearchNodes(), SearchNodes())
+    queues = (util.PriorityQueue(), util.PriorityQueue())
+    costs = ({start: 0}, {goal: 0})
+    best = ({start: nodes[0].add(start)}, {goal: nodes[1].add(goal)})
+    closed = (set(), set())
+    queues[0].push(best[0][start], 0)
+    queues[1].push(best[1][goal], 0)
+
+    # Cost of the cheapest path found so far, and the node pair where it meets
+    bestCost, meeting = float('inf'), None
+
+    while True:
+
+        # Drop fringe entries for states that have already been expanded
+        for side in (0, 1):
+            queue, states = queues[side], nodes[side].states
+            while queue and states[queue.peek()] in closed[side]:
+                queue.pop()
+        if not queues[0] or not queues[1]: break
+
+        # Stop once no path through the fringes can beat the best one found
+        tops = [queues[side].heap[0][0] for side in (0, 1)]
+        if tops[0] + tops[1] >= bestCost: break
+
+        # Expand the direction whose best fringe node is cheaper
+        side = 0 if tops[0] <= tops[1] else 1
+        other = 1 - side
+        node = queues[side].pop()
+        state = nodes[side].states[node]
+        closed[side].add(state)
+
+        cost = costs[side][state]
+        for successor, action, stepCost in expand[side](state):
+            if successor in closed[side]: continue
+
+            new_cost = cost + stepCost
+            if new_cost < costs[side].get(successor, float('inf')):
+                costs[side][successor] = new_cost
+                best[side][successor] = nodes[side].add(successor, node, action, new_cost)
+                queues[side].push(best[side][successor], new_cost + sign[side] * potential(successor))
+
+                # Record the path if the successor has been reached from the other end
+                if successor in costs[other] and new_cost + costs[other][successor] < bestCost:
+                    bestCost = new_cost + costs[other][successor]
+                    meeting = (best[0][successor], best[1][successor])
+
+    if meeting == None: return []
+
+    # The backward path lists the actions from the goal back to the meeting point
+    forwardNode, backwardNode = meeting
+    backwardPath = nodes[1].path(backwardNode)
+    backwardPath.reverse()
+    return nodes[0].path(forwardNode) + backwardPath
+
+
+def jumpPointSearch(problem: SearchProblem, heuristic=nullHeuristic):
+    """
+    Jump point search: A* on a 4-connected grid with uniform step costs,
+    which only expands the jump points where an optimal path may turn.
+
+    Paths are put in a canonical form, vertical moves before horizontal
+    ones, and a straight run only stops where a wall opens a side cell that
+    no canonical path reaches otherwise (a forced neighbor), at a goal, or
+    (moving vertically) on a row with a jump point to one side.  The path
+    returned is optimal, though among equally short paths it may not be the
+    one aStarSearch picks.
+
+    Works directly on problem.walls for problems whose states are (x, y)
+    cells and every step costs the same, like PositionSearchProblem with
+    its default cost and AnyFoodSearchProblem.  Each jump point expanded is
+    counted in problem._expanded and added to the expanded-cell display.
+    """
+    from game import Directions
+    walls = problem.walls
+    width, height = walls.width, walls.height
+    isGoal = problem.isGoalState
+    names = {(0, 1): Directions.NORTH, (0, -1): Directions.SOUTH,
+             (1, 0): Directions.EAST, (-1, 0): Directions.WEST}
+
+    def free(x, y):
+        return 0 <= x < width and 0 <= y < height and not walls[x][y]
+
+    def jump(x, y, dx, dy):
+        "Runs from (x, y) towards (dx, dy); returns the jump point reached, or None."
+        while True:
+            x, y = x + dx, y + dy
+            if not free(x, y): return None
+            if isGoal((x, y)): return (x, y)
+            if dx != 0:
+                if (free(x, y + 1) and not free(x - dx, y + 1)) or \
+                   (free(x, y - 1) and not free(x - dx, y - 1)):
+                    return (x, y)
+            else:
+                if (free(x + 1, y) and not free(x + 1, y - dy)) or \
+                   (free(x - 1, y) and not free(x - 1, y - dy)):
+                    return (x, y)
+                if jump(x, y, 1, 0) != None or jump(x, y, -1, 0) != None:
+                    return (x, y)
+
+    start = problem.getStartState()
+    if isGoal(start): return []
+
+    # The best cost found to each jump point and the jump point before it
+    costs = {start: 0}
+    parents = {start: None}
+    closed = set()
+    queue = util.PriorityQueue()
+    queue.push(start, heuristic(start, problem))
+
+    while queue:
+        state = queue.pop()
+        if state in closed: continue
+        closed.add(state)
+        if isGoal(state): break
+
+        # Bookkeeping for display purposes
+        problem._expanded += 1
+        if '_visited' in dir(problem) and state not in problem._visited:
+            problem._visited[state] = True
+            problem._visitedlist.append(state)
+
+        # Keep going straight or turn; never turn back
+        x, y = state
+        parent = parents[state]
+        if parent == None:
+            directions = list(names)
+        else:
+            dx, dy = (x > parent[0]) - (x < parent[0]), (y > parent[1]) - (y < parent[1])
+            directions = [(dx, dy), (dy, dx), (-dy, -dx)]
+
+        for dx, dy in directions:
+            successor = jump(x, y, dx, dy)
+            if successor == None or successor in closed: continue
+            new_cost = costs[state] + abs(successor[0] - x) + abs(successor[1] - y)
+            if successor not in costs or new_cost < costs[successor]:
+                costs[successor] = new_cost
+                parents[successor] = state
+                queue.push(successor, new_cost + heuristic(successor, problem))
+    else:
+        return []
+
+    # Unroll the straight runs between jump points into single steps
+    actions = []
+    while parents[state] != None:
+        parent = parents[state]
+        dx, dy = state[0] - parent[0], state[1] - parent[1]
+        steps = abs(dx) + abs(dy)
+        actions.extend([names[(dx // steps, dy // steps)]] * steps)
+        state = parent
+    actions.reverse()
+    return actions
+
+
+class DStarLite:
+    """
+    Incremental shortest paths from a moving start to the nearest of a
+    shrinking (or growing) set of goals: D* Lite (Koenig and Likhachev),
+    with every goal a target of the backward search.
+
+    The planner keeps g, the cost from each state to its nearest goal, as
+    found so far, and rhs, the one-step lookahead of g, and only repairs the
+    states affected when Pacman moves or a goal is removed, instead of
+    searching again from scratch.  The successors and predecessors of each
+    state are asked of the problem once and remembered, so the problem's
+    getSuccessors and getPredecessors must not change.
+
+    distance(a, b) must never overestimate the cost from a to b and obey the
+    triangle inequality (Manhattan distance does, in a maze); it defaults to
+    0, which plans like Dijkstra's algorithm.
+
+      planner = DStarLite(problem, food.asList(), util.manhattanDistance)
+      actions = planner.plan(position)     # to the nearest dot
+      planner.removeGoal(dot)              # once it is eaten
+    """
+
+    def __init__(self, problem, goals, distance=lambda a, b: 0):
+        self.problem = problem
+        self.goals = set(goals)
+        self.distance = distance
+        self.g, self.rhs = {}, {}
+        self.successors, self.predecessors = {}, {}
+        self.queue = util.PriorityQueue()
+        self.keys = {}
+        self.km = 0
+        self.start = self.last = problem.getStartState()
+        self.expanded = 0
+        for goal in self.goals:
+            self.rhs[goal] = 0
+            self._queue(goal, self._key(goal))
+
+    def _successors(self, state):
+        if state not in self.successors:
+            self.successors[state] = [(successor, action, cost) for successor, action, cost
+                                      in self.problem.getSuccessors(state)]
+        return self.successors[state]
+
+    def _predecessors(self, state):
+        if state not in self.predecessors:
+            self.predecessors[state] = [(predecessor, cost) for predecessor, _, cost
+                                        in self.problem.getPredecessors(state)]
+        return self.predecessors[state]
+
+    def _key(self, state):
+        best = min(self.g.get(state, float('inf')), self.rhs.get(state, float('inf')))
+        return (best + self.distance(self.start, state) + self.km, best)
+
+    def _queue(self, state, key):
+        "Puts state in the queue with key, replacing any entry it had."
+        self.keys[state] = key
+        self.queue.push((key, state), key)
+
+    def _top(self):
+        "Returns (key, state) for the first valid queue entry, or None."
+        queue, keys = self.queue, self.keys
+        while queue:
+            key, state = queue.peek()
+            if keys.get(state) == key: return key, state
+            queue.pop()
+        return None
+
+    def _lookahead(self, state):
+        "Returns the best cost to a goal through a successor of state."
+        if state in self.goals: return 0
+        g = self.g
+        return min([cost + g.get(successor, float('inf')) for successor, _, cost in self._successors(state)]
+                   or [float('inf')])
+
+    def _updateState(self, state):
+        inf = float('inf')
+        if self.g.get(state, inf) != self.rhs.get(state, inf):
+            self._queue(state, self._key(state))
+        else:
+            self.keys.pop(state, None)
+
+    def _computeShortestPath(self):
+        inf = float('inf')
+        g, rhs, keys = self.g, self.rhs, self.keys
+        start, distance, km = self.start, self.distance, self.km
+        while True:
+            top = self._top()
+            if top == None: break
+            keyOld, state = top
+            startG, startRhs = g.get(start, inf), rhs.get(start, inf)
+            if not (keyOld < (min(startG, startRhs) + km, min(startG, startRhs)) or startRhs > startG): break
+
+            stateG, stateRhs = g.get(state, inf), rhs.get(state, inf)
+            best = min(stateG, stateRhs)
+            keyNew = (best + distance(start, state) + km, best)
+            if keyOld < keyNew:
+                self._queue(state, keyNew)
+                continue
+            self.expanded += 1
+            del keys[state]
+            if stateG > stateRhs:
+                # Overconsistent: settle it and relax its predecessors
+                g[state] = stateRhs
+                for predecessor, cost in self._predecessors(state):
+                    if cost + stateRhs < rhs.get(predecessor, inf):
+                        rhs[predecessor] = cost + stateRhs
+                        self._updateState(predecessor)
+            else:
+                # Underconsistent: raise it and fix whoever relied on it
+                g[state] = inf
+                affected = [state] + [predecessor for predecessor, cost in self._predecessors(state)
+                                      if rhs.get(predecessor, inf) == cost + stateG]
+                for other in affected:
+                    rhs[other] = self._lookahead(other)
+                    self._updateState(other)
+
+    def removeGoal(self, goal):
+        "Stops treating goal as a goal, e.g. once its dot is eaten."
+        if goal not in self.goals: return
+        self.goals.remove(goal)
+        self.rhs[goal] = self._lookahead(goal)
+        self._updateState(goal)
+
+    def addGoal(self, goal):
+        self.goals.add(goal)
+        self.rhs[goal] = 0
+        self._updateState(goal)
+
+    def plan(self, start):
+        """
+        Returns the actions from start to its nearest goal, or [] if no
+        goal can be reached.  Call it with each new start as Pacman moves.
+        """
+        self.start = start
+        self.km += self.distance(self.last, start)
+        self.last = start
+        self._computeShortestPath()
+
+        inf = float('inf')
+        g = self.g
+        if self.rhs.get(start, inf) == inf: return []
+        actions, state = [], start
+        while state not in self.goals:
+            _, action, state = min([(cost + g.get(successor, inf), action, successor)
+                                    for successor, action, cost in self._successors(state)])
+            actions.append(action)
+        return actions
+
+
+class _HashPartition:
+    """
+    One worker's share of a parallelAStarSearch: the states whose hash is
+    index modulo the number of workers, with the cheapest cost and parent
+    found for each, and a fringe of (f, tie, cost, state) entries.  An entry
+    is stale once a cheaper path to its state has been found.
+    """
+
+    def __init__(self, problem, heuristic, index, workers):
+        self.problem, self.heuristic = problem, heuristic
+        self.index, self.workers = index, workers
+        self.costs = {}
+        self.parents = {}
+        self.fringe = []
+        self.ties = 0
+        self.goal, self.goalCost = None, float('inf')
+        # The cheapest plan found by any worker; nothing dearer is searched
+        self.bound = float('inf')
+        self.expanded = 0
+
+    def receive(self, state, cost, parent, action):
+        "Records a path to state if it is the cheapest so far."
+        if cost >= self.bound or cost >= self.costs.get(state, float('inf')): return
+        self.costs[state] = cost
+        self.parents[state] = (parent, action)
+        self.ties += 1
+        heapq.heappush(self.fringe, (cost + self.heuristic(state, self.problem), self.ties, cost, state))
+
+    def lowestF(self):
+        "Returns the lowest f in the fringe, dropping stale entries on the way."
+        fringe = self.fringe
+        while fringe and fringe[0][2] != self.costs[fringe[0][3]]:
+            heapq.heappop(fringe)
+        return fringe[0][0] if fringe else float('inf')
+
+    def round(self, received, limit, bound, threshold):
+        """
+        Takes in the paths other workers sent, then expands up to limit of
+        the best states with f no higher than threshold.  Returns the paths
+        to send on, one list per worker, with the lowest f left, the cost and
+        goal state of the cheapest plan found here and the number of states
+        expanded so far.
+        """
+        self.bound = min(self.bound, bound)
+        for path in received:
+            self.receive(*path)
+
+        sent = [[] for _ in range(self.workers)]
+        expansions = 0
+        while expansions < limit and self.lowestF() <= threshold and self.lowestF() < self.bound:
+            _, _, cost, state = heapq.heappop(self.fringe)
+            if self.problem.isGoalState(state):
+                self.goal, self.goalCost = state, cost
+                self.bound = min(self.bound, cost)
+                continue
+            expansions += 1
+            for successor, action, stepCost in self.problem.getSuccessors(state):
+                owner = hash(successor) % self.workers
+                if owner == self.index:
+                    self.receive(successor, cost + stepCost, state, action)
+                else:
+                    sent[owner].append((successor, cost + stepCost, state, action))
+        self.expanded += expansions
+        return sent, self.lowestF(), self.goalCost, self.goal, self.expanded
+
+def _partitionWorker(partition, connection):
+    "Runs a partition in a worker process, answering requests on connection until stopped."
+    while True:
+        request = connection.recv()
+        if request[0] == 'round':
+            connection.send(partition.round(*request[1:]))
+        elif request[0] == 'parent':
+            connection.send(partition.parents[request[1]])
+
+def parallelAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, workers=None, batchSize=100):
+    """
+    Hash-distributed A* (HDA*) across worker processes.
+
+    Every state belongs to one worker, chosen by its hash, which keeps the
+    cheapest path found to it and expands it.  The search runs in rounds:
+    each worker takes in the paths sent to it, expands up to batchSize of
+    its states with the lowest f left anywhere after the last round, and
+    hands back the successors that belong to other workers.  It stops once
+    the cheapest plan found costs no more than the lowest f left in any
+    fringe or on its way to one, so with an admissible heuristic the plan
+    is optimal, just as with aStarSearch.
+
+    workers defaults to one per CPU.  With one worker, or where processes
+    cannot be forked, the partitions run in this process in turn.  The
+    workers' expansions are added to problem._expanded, but a display of the
+    states expanded only sees those of this process.
+    """
+    import multiprocessing
+    import os
+    workers = int(workers) if workers != None else os.cpu_count() or 1
+    batchSize = int(batchSize)
+    inf = float('inf')
+
+    partitions = [_HashPartition(problem, heuristic, index, workers) for index in range(workers)]
+    forked = workers > 1 and 'fork' in multiprocessing.get_all_start_methods()
+    processes, connections = [], []
+    if forked:
+        context = multiprocessing.get_context('fork')
+        for partition in partitions:
+            connection, workerConnection = context.Pipe()
+            process = context.Process(target=_partitionWorker, args=(partition, workerConnection), daemon=True)
+            process.start()
+            processes.append(process)
+            connections.append(connection)
+
+    def parent(state):
+        owner = hash(state) % workers
+        if not forked: return partitions[owner].parents[state]
+        connections[owner].send(('parent', state))
+        return connections[owner].recv()
+
+    try:
+        start = problem.getStartState()
+        inboxes = [[] for _ in range(workers)]
+        inboxes[hash(start) % workers].append((start, 0, None, None))
+        bound, lowest = inf, 0
+        while True:
+            if forked:
+                for connection, inbox in zip(connections, inboxes):
+                    connection.send(('round', inbox, batchSize, bound, lowest))
+                results = [connection.recv() for connection in connections]
+            else:
+                results = [partition.round(inbox, batchSize, bound, lowest) for partition, inbox in zip(partitions, inboxes)]
+
+            inboxes = [[] for _ in range(workers)]
+            lowest = inf
+            for sent, lowestF, goalCost, goal, expanded in results:
+                lowest = min(lowest, lowestF)
+                bound = min(bound, goalCost)
+                for owner, paths in enumerate(sent):
+                    inboxes[owner].extend(paths)
+                    # A path in flight has f of at least its cost
+                    for path in paths: lowest = min(lowest, path[1])
+            if bound <= lowest: break
+
+        if forked and '_expanded' in dir(problem):
+            problem._expanded += sum(result[4] for result in results)
+        if bound == inf: return []
+
+        # Follow the parents back from the goal, asking each state's owner
+        state = min(results, key=lambda result: result[2])[3]
+        actions = []
+        while True:
+            previous, action = parent(state)
+            if previous == None: break
+            actions.append(action)
+            state = previous
+        actions.reverse()
+        return actions
+    finally:
+        # A worker may be partway through a round if the search was interrupted
+        for process in processes:
+            process.terminate()
+            process.join()
+
+
+def _findPlan(problem, actions):
+    """
+    Follows actions from the start state.  Returns (True, cost) if they are
+    legal and end at a goal, else (False, None).
+    """
+    if actions == None: return False, None
+    state, cost = problem.getStartState(), 0
+    for action in actions:
+        for successor, successorAction, stepCost in problem.getSuccessors(state):
+            if successorAction == action:
+                state, cost = successor, cost + stepCost
+                break
+        else:
+            return False, None
+    if not problem.isGoalState(state): return False, None
+    return True, cost
+
+def _lookupHeuristic(name):
+    "Returns the heuristic called name in search.py, searchAgents.py or foodHeuristics.py."
+    if name in globals(): return globals()[name]
+    import searchAgents
+    import foodHeuristics
+    for module in (searchAgents, foodHeuristics):
+        if name in dir(module): return getattr(module, name)
+    raise AttributeError(name + ' is not a heuristic in search.py, searchAgents.py or foodHeuristics.py')
+
+def _runMember(index, function, heuristic, problem, results):
+    """
+    Runs one member of a portfolioSearch and puts (index, actions, stats)
+    on the results queue.
+    """
+    startTime = time.time()
+    expanded = getattr(problem, '_expanded', None)
+    stats = {'status': 'ok', 'cost': None, 'expanded': None, 'seconds': None}
+    actions = None
+    try:
+        if heuristic != None:
+            actions = function(problem, heuristic=heuristic)
+        else:
+            actions = function(problem)
+        stats['seconds'] = time.time() - startTime
+        if expanded != None: stats['expanded'] = problem._expanded - expanded
+        valid, stats['cost'] = _findPlan(problem, actions)
+        # Checking the plan is not part of the search
+        if expanded != None: problem._expanded = expanded + stats['expanded']
+        if not valid: stats['status'], actions = 'invalid plan', None
+    except (Exception, SystemExit) as e:
+        # util.raiseNotDefined exits rather than raising
+        stats['status'] = type(e).__name__
+        stats['seconds'] = time.time() - startTime
+    results.put((index, actions, stats))
+
+def portfolioSearch(problem: SearchProblem, heuristic=nullHeuristic, members='dfs+bfs+ucs+astar',
+                    costBound=None, timeLimit=None):
+    """
+    Races several searches on the problem, each in its own process, and
+    returns the first plan that reaches a goal for at most costBound (or
+    for any cost, if there is no bound).  The other searches are stopped.
+
+    members names the searches, separated by '+'.  Each is a function in
+    search.py, optionally followed by ':' and a heuristic, as in
+    members=bfs+astar:manhattanHeuristic; a member given no heuristic of its
+    own uses heuristic.  If no plan meets the bound, the cheapest valid one
+    is returned once every member has finished or timeLimit seconds have
+    passed.  One line of statistics is printed for each member, and the same
+    statistics are kept in problem._portfolio as dictionaries.  Without fork
+    the members run in this process in turn.
+    """
+    import multiprocessing
+    import queue
+    costBound = float(costBound) if costBound != None else None
+    timeLimit = float(timeLimit) if timeLimit != None else None
+    if isinstance(members, str): members = members.split('+')
+
+    configured = []
+    for member in members:
+        name, _, heuristicName = member.partition(':')
+        if name not in globals():
+            raise AttributeError(name + ' is not a search function in search.py.')
+        function = globals()[name]
+        takesHeuristic = 'heuristic' in function.__code__.co_varnames[:function.__code__.co_argcount]
+        memberHeuristic = None
+        if takesHeuristic:
+            memberHeuristic = _lookupHeuristic(heuristicName) if heuristicName else heuristic
+        label = function.__name__ + ('/' + memberHeuristic.__name__ if memberHeuristic != None else '')
+        configured.append((label, function, memberHeuristic))
+
+    def meetsBound(stats):
+        return stats['status'] == 'ok' and (costBound == None or stats['cost'] <= costBound)
+
+    startTime = time.time()
+    winner = None
+    allStats = [{'member': label, 'status': 'cancelled', 'cost': None, 'expanded': None, 'seconds': None}
+                for label, _, _ in configured]
+    plans = {}
+    forked = 'fork' in multiprocessing.get_all_start_methods()
+    if forked:
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        processes = [context.Process(target=_runMember, args=(index, function, memberHeuristic, problem, results),
+                                     daemon=True)
+                     for index, (_, function, memberHeuristic) in enumerate(configured)]
+        try:
+            for process in processes: process.start()
+            pending = set(range(len(processes)))
+            while pending:
+                if timeLimit != None and time.time() - startTime > timeLimit: break
+                try:
+                    index, actions, stats = results.get(timeout=0.05)
+                except queue.Empty:
+                    # A member that died without reporting back
+                    for index in list(pending):
+                        if not processes[index].is_alive() and results.empty():
+                            allStats[index]['status'] = 'exit code %s' % processes[index].exitcode
+                            pending.discard(index)
+                    continue
+                pending.discard(index)
+                allStats[index].update(stats)
+                if actions != None: plans[index] = actions
+                if meetsBound(stats):
+                    winner = index
+                    break
+        finally:
+            for process in processes:
+                process.terminate()
+                process.join()
+    else:
+        for index, (_, function, memberHeuristic) in enumerate(configured):
+            if timeLimit != None and time.time() - startTime > timeLimit: break
+            results = queue.Queue()
+            _runMember(index, function, memberHeuristic, problem, results)
+            _, actions, stats = results.get()
+            allStats[index].update(stats)
+            if actions != None: plans[index] = actions
+            if meetsBound(stats):
+                winner = index
+                break
+
+    problem._portfolio = allStats
+    if forked and '_expanded' in dir(problem):
+        # The members expanded copies of the problem
+        problem._expanded += sum(stats['expanded'] or 0 for stats in allStats)
+    for stats in allStats:
+        details = [stats['status']]
+        if stats['cost'] != None: details.append('cost %s' % stats['cost'])
+        if stats['expanded'] != None: details.append('expanded %d' % stats['expanded'])
+        if stats['seconds'] != None: details.append('%.3f seconds' % stats['seconds'])
+        print('[portfolioSearch] %s: %s' % (stats['member'], ', '.join(details)))
+
+    if winner == None:
+        if not plans: return []
+        winner = min(plans, key=lambda index: allStats[index]['cost'])
+        print('[portfolioSearch] no plan within the cost bound; returning the cheapest found')
+    return plans[winner]
+
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bidir = bidirectionalSearch
+jps = jumpPointSearch
+idastar = iterativeDeepeningAStarSearch
+smastar = smaStarSearch
+arastar = anytimeAStarSearch
+parallelAStar = parallelAStarSearch
+portfolio = portfolioSearch
@@ -37,9 +37,15 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import Grid
 import util
 import time
 import search
+import functools
+import ast
+from mazeDistances import MazeDistanceOracle
+from foodHeuristics import mstFoodHeuristic, farthestPairFoodHeuristic, patternDatabaseFoodHeuristic
+import distanceFields
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -56,6 +62,19 @@ class GoWestAgent(Agent):
 #       after you fill in parts of search.py          #
 #######################################################
 
+def parseSearchArgument(value):
+    """
+    Converts a search option given as a string with -a into the number,
+    True, False or None it spells; anything else stays a string.
+    """
+    if not isinstance(value, str): return value
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+    if parsed is None or isinstance(parsed, (bool, int, float)): return parsed
+    return value
+
 class SearchAgent(Agent):
     """
     This very general search agent finds a path using a supplied search
@@ -68,19 +87,39 @@ class SearchAgent(Agent):
     Options for fn include:
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
+      bidirectionalSearch or bidir (PositionSearchProblem only)
+      jumpPointSearch or jps (PositionSearchProblem and AnyFoodSearchProblem)
+      iterativeDeepeningAStarSearch or idastar
+      smaStarSearch or smastar
+      anytimeAStarSearch or arastar (stops improving its plan after timeLimit seconds)
+      parallelAStarSearch or parallelAStar (spreads the search over workers processes)
+      portfolioSearch or portfolio (races members=dfs+bfs+astar:... for a plan within costBound)
+
+    Any other option is passed to the search function as a keyword argument,
+    e.g. -a fn=smastar,heuristic=foodHeuristic,maxNodes=20000.  Numbers,
+    True, False and None are converted; other values stay strings.
 
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', **searchArgs):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
         if fn not in dir(search):
             raise AttributeError(fn + ' is not a search function in search.py.')
         func = getattr(search, fn)
-        if 'heuristic' not in func.__code__.co_varnames:
+        arguments = func.__code__.co_varnames[:func.__code__.co_argcount]
+        for name in searchArgs:
+            if name not in arguments:
+                raise AttributeError(name + ' is not an argument of ' + fn + ' in search.py.')
+        if searchArgs:
+            # Any remaining options are passed through to the search function
+            searchArgs = dict((name, parseSearchArgument(value)) for name, value in searchArgs.items())
+            print('[SearchAgent] using search arguments %s' % searchArgs)
+            func = functools.partial(func, **searchArgs)
+        if 'heuristic' not in arguments:
             print('[SearchAgent] using function ' + fn)
             self.searchFunction = func
         else:
@@ -116,6 +155,8 @@ class SearchAgent(Agent):
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if '_peakNodes' in dir(problem): print('Peak search nodes in memory: %d' % problem._peakNodes)
+        if '_suboptimalityBound' in dir(problem): print('Suboptimality bound: %.3f' % problem._suboptimalityBound)
 
     def getAction(self, state):
         """
@@ -210,6 +251,32 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def getGoalState(self):
+        return self.goal
+
+    def getPredecessors(self, state):
+        """
+        Returns predecessor states, the actions that lead from them to state,
+        and the cost of that step, for searches that work back from the goal.
+        """
+
+        predecessors = []
+        cost = self.costFn(state)
+        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            x,y = state
+            dx, dy = Actions.directionToVector(action)
+            prevx, prevy = int(x - dx), int(y - dy)
+            if not self.walls[prevx][prevy]:
+                predecessors.append( ( (prevx, prevy), action, cost) )
+
+        # Bookkeeping for display purposes
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -288,6 +355,7 @@ class CornersProblem(search.SearchProblem):
                 print('Warning: no food in corner ' + str(corner))
 
         self._expanded = 0 # DO NOT CHANGE; Number of search nodes expanded
+        self.heuristicInfo = {} # A dictionary for the heuristic to store information
 
         # Please add any code here which you would like to use
         # in initializing the problem
@@ -381,6 +449,12 @@ def cornersHeuristic(state, problem):
     # Get the current position and remaining corners
     currentPosition, corners = state
 
+    # The farthest remaining corner by maze distance is also a lower bound
+    if 'mazeDistances' not in problem.heuristicInfo:
+        problem.heuristicInfo['mazeDistances'] = MazeDistanceOracle.forWalls(walls)
+    oracle = problem.heuristicInfo['mazeDistances']
+    farthest = max([oracle.pathLength(currentPosition, corner) for corner in corners], default=0)
+
     while len(corners) > 0:
 
         # Find the closest corner
@@ -396,7 +470,7 @@ def cornersHeuristic(state, problem):
         currentPosition = closestCorner
 
     # Return the cost
-    return cost
+    return max(cost, farthest)
 
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
@@ -491,22 +565,46 @@ def foodHeuristic(state, problem):
     position, foodGrid = state
     cost = 0
 
+    # Look maze distances up instead of searching for each one
+    if 'mazeDistances' not in problem.heuristicInfo:
+        problem.heuristicInfo['mazeDistances'] = MazeDistanceOracle.forWalls(problem.walls)
+    oracle = problem.heuristicInfo['mazeDistances']
+
     # Loop through the food grid
     for food in foodGrid.asList():
 
         # Store the largest distance to the food
-        cost = max(cost, mazeDistance(position, food, problem.startingGameState))
+        cost = max(cost, mazeDistance(position, food, problem.startingGameState, oracle))
 
     # Return the cost
     return cost
 
 class ClosestDotSearchAgent(SearchAgent):
-    "Search for all food using a sequence of searches"
+    """
+    Search for all food using a sequence of searches.
+
+    With planner=dstar (-a planner=dstar) one search.DStarLite planner is
+    kept for the whole game and repaired after each dot, instead of running
+    a new A* search for every dot.  With planner=field each A* search is
+    guided by anyFoodHeuristic, a distance field to the food.
+    """
+    def __init__(self, planner='astar', **kwargs):
+        if planner not in ('astar', 'field', 'dstar'):
+            raise AttributeError(planner + ' is not a planner; use astar, field or dstar.')
+        self.planner = planner
+        SearchAgent.__init__(self, **kwargs)
+
     def registerInitialState(self, state):
         self.actions = []
         currentState = state
+        if self.planner == 'dstar':
+            problem = PositionSearchProblem(state, warn=False, visualize=False)
+            self.dStarLite = search.DStarLite(problem, state.getFood().asList(), util.manhattanDistance)
         while(currentState.getFood().count() > 0):
             nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
+            if not nextPathSegment:
+                # The dots left cannot be reached
+                break
             self.actions += nextPathSegment
             for action in nextPathSegment:
                 legal = currentState.getLegalActions()
@@ -514,6 +612,8 @@ class ClosestDotSearchAgent(SearchAgent):
                     t = (str(action), str(currentState))
                     raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % t)
                 currentState = currentState.generateSuccessor(0, action)
+                if self.planner == 'dstar':
+                    self.dStarLite.removeGoal(currentState.getPacmanPosition())
         self.actionIndex = 0
         print('Path found with cost %d.' % len(self.actions))
 
@@ -526,10 +626,14 @@ class ClosestDotSearchAgent(SearchAgent):
         startPosition = gameState.getPacmanPosition()
         food = gameState.getFood()
         walls = gameState.getWalls()
+        if self.planner == 'dstar':
+            return self.dStarLite.plan(startPosition)
         problem = AnyFoodSearchProblem(gameState)
 
         # A* search
-        return search.aStarSearch(problem, heuristic=search.nullHeuristic)
+        if self.planner == 'field':
+            return search.aStarSearch(problem, heuristic=anyFoodHeuristic)
+        return search.aStarSearch(problem)
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
@@ -567,7 +671,20 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         # Return the food at the current state (undefined if no food is present)
         return self.food[x][y]
 
-def mazeDistance(point1, point2, gameState):
+def anyFoodHeuristic(state, problem):
+    """
+    The maze distance from state to the nearest food of an AnyFoodSearchProblem:
+    exact, so A* walks straight to the closest dot.  The distances from every
+    cell are computed once, with one breadth-first search from all the food,
+    and kept on the problem.
+    """
+    if not hasattr(problem, 'foodField'):
+        problem.foodField = distanceFields.gridField(problem.walls, problem.food)
+    distance = problem.foodField.distance(state)
+    if distance == None: return 0
+    return distance
+
+def mazeDistance(point1, point2, gameState, oracle=None):
     """
     Returns the maze distance between any two points, using the search functions
     you have already built. The gameState can be any game state -- Pacman's
@@ -575,6 +692,10 @@ def mazeDistance(point1, point2, gameState):
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
+    For many queries on the same layout, pass a MazeDistanceOracle for its walls
+    (MazeDistanceOracle.forWalls(gameState.getWalls())) and the distance is
+    looked up instead of searched for.
+
     This might be a useful helper function for your ApproximateSearchAgent.
     """
     x1, y1 = point1
@@ -582,5 +703,155 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
+    if oracle != None:
+        return oracle.pathLength(point1, point2)
     prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return len(search.bidirectionalSearch(prob))
+
+#########################################################
+# Bitboard encodings of the corners and food problems.  #
+# Sets of cells are ints, so copying, hashing, equality #
+# and the goal test are O(1) on a search state.         #
+#########################################################
+
+class CellNumbering:
+    """
+    Numbers the open cells of a layout, so that a set of cells can be stored as
+    the bits of a Python int: cell number i is the bit 1 << i.
+    """
+
+    def __init__(self, walls):
+        self.width, self.height = walls.width, walls.height
+        self.cells = walls.asList(False)
+        self.bits = {cell: 1 << i for i, cell in enumerate(self.cells)}
+
+    def mask(self, positions):
+        "Returns the int with the bits of the given open cells set."
+        mask = 0
+        for position in positions:
+            mask |= self.bits[position]
+        return mask
+
+    def positions(self, mask):
+        "Returns the cells whose bits are set in mask, in cell order."
+        positions = []
+        while mask:
+            low = mask & -mask
+            positions.append(self.cells[low.bit_length() - 1])
+            mask ^= low
+        return positions
+
+    def toGrid(self, mask):
+        "Returns a Grid (see game.py) which is True at the cells set in mask."
+        grid = Grid(self.width, self.height)
+        for x, y in self.positions(mask):
+            grid[x][y] = True
+        return grid
+
+def _moveTable(walls, cells):
+    """
+    Returns, for every open cell, the list of (nextCell, direction, nextBit) of
+    the moves out of it, in the order the other problems generate them.
+    """
+    moves = {}
+    for x, y in cells.cells:
+        moves[(x, y)] = []
+        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            dx, dy = Actions.directionToVector(direction)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not walls[nextx][nexty]:
+                moves[(x, y)].append(((nextx, nexty), direction, cells.bits[(nextx, nexty)]))
+    return moves
+
+class BitboardCornersProblem(CornersProblem):
+    """
+    The CornersProblem, with the corners not yet visited stored as a 4-bit int.
+
+    A search state is a tuple ( pacmanPosition, cornerBits ), where bit i of
+    cornerBits is set while problem.corners[i] has not been visited.  Use
+    viewState to get the equivalent CornersProblem state.
+    """
+
+    def __init__(self, startingGameState):
+        CornersProblem.__init__(self, startingGameState)
+        self.cornerBits = {corner: 1 << i for i, corner in enumerate(self.corners)}
+        self.moves = _moveTable(self.walls, CellNumbering(self.walls))
+
+    def getStartState(self):
+        return (self.startingPosition, (1 << len(self.corners)) - 1)
+
+    def isGoalState(self, state):
+        return state[1] == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        position, remaining = state
+        successors = [((nextPosition, remaining & ~self.cornerBits.get(nextPosition, 0)), direction, 1)
+                      for nextPosition, direction, _ in self.moves[position]]
+        self._expanded += 1 # DO NOT CHANGE
+        return successors
+
+    def viewState(self, state):
+        "Returns the CornersProblem state ( pacmanPosition, remainingCorners )."
+        position, remaining = state
+        return (position, tuple(corner for corner in self.corners if remaining & self.cornerBits[corner]))
+
+class BitboardFoodSearchProblem(FoodSearchProblem):
+    """
+    The FoodSearchProblem, with the remaining food stored as an int.
+
+    A search state is a tuple ( pacmanPosition, foodBits ), where foodBits has
+    a bit set for every remaining food dot, numbered by problem.cells (a
+    CellNumbering).  Use viewState to get the equivalent FoodSearchProblem
+    state, with the food as a Grid.
+    """
+
+    def __init__(self, startingGameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        self.cells = CellNumbering(self.walls)
+        self.moves = _moveTable(self.walls, self.cells)
+        position, food = self.start
+        self.start = (position, self.cells.mask(food.asList()))
+
+    def isGoalState(self, state):
+        return state[1] == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        self._expanded += 1 # DO NOT CHANGE
+        position, food = state
+        return [((nextPosition, food & ~bit), direction, 1) for nextPosition, direction, bit in self.moves[position]]
+
+    def viewState(self, state):
+        "Returns the FoodSearchProblem state ( pacmanPosition, foodGrid )."
+        position, food = state
+        return (position, self.cells.toGrid(food))
+
+def gridViewHeuristic(heuristic):
+    """
+    Adapts a heuristic written for CornersProblem or FoodSearchProblem states
+    to the matching bitboard problem, by converting every state it is given
+    with problem.viewState.
+    """
+    def viewHeuristic(state, problem):
+        return heuristic(problem.viewState(state), problem)
+    return viewHeuristic
+
+bitboardCornersHeuristic = gridViewHeuristic(cornersHeuristic)
+
+def bitboardFoodHeuristic(state, problem):
+    """
+    foodHeuristic for BitboardFoodSearchProblem states: the largest maze
+    distance to any remaining food, read straight from the food bits.
+    """
+    position, food = state
+    if 'mazeDistances' not in problem.heuristicInfo:
+        problem.heuristicInfo['mazeDistances'] = MazeDistanceOracle.forWalls(problem.walls)
+    oracle = problem.heuristicInfo['mazeDistances']
+    return max([oracle.pathLength(position, dot) for dot in problem.cells.positions(food)], default=0)
+
+class AStarBitboardFoodSearchAgent(SearchAgent):
+    "A SearchAgent for BitboardFoodSearchProblem using A* and bitboardFoodHeuristic"
+    def __init__(self):
+        self.searchFunction = lambda prob: search.aStarSearch(prob, bitboardFoodHeuristic)
+        self.searchType = BitboardFoodSearchProblem
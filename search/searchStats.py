@@ -0,0 +1,329 @@
+"""
+Opt-in instrumentation for the algorithms in search.py.
+
+recordSearch runs a search function on a problem and returns its plan along
+with a record of where the work went, without touching the algorithm code:
+
+  actions, record = searchStats.recordSearch(search.aStarSearch, problem, manhattanHeuristic)
+
+The problem is wrapped so successor (and predecessor) calls are counted and
+timed, the heuristic is wrapped so its calls are counted and timed (it is
+still handed the unwrapped problem, so its own work is not counted), and while
+the search runs the fringe classes in util are swapped for subclasses that
+count pushes and pops and track the size of the fringe.
+
+A record is a dictionary with the keys in FIELDS.  Fields that an algorithm
+gives no meaning to are None: IDA* and SMA* keep their own fringes rather than
+the util containers, for instance, so their pushes and pops are not counted.
+The heuristic cache fields are only filled in for a search.CachedHeuristic,
+and the violations only if it checks itself, in which case the plan found
+is checked for admissibility too.
+Records can be written with writeJSON or writeCSV, or collected from the
+command line for a list of layouts:
+
+> python searchStats.py -l tinyMaze,mediumMaze,bigMaze -f astar -H manhattanHeuristic -o stats.csv
+"""
+
+import csv
+import json
+import time
+
+import search
+import util
+
+FIELDS = ['layout', 'function', 'problem', 'heuristic', 'cost', 'pathLength',
+          'expanded', 'generated', 'goalTests', 'pushes', 'pops', 'duplicates',
+          'peakFringe', 'heuristicCalls', 'heuristicSeconds', 'heuristicHitRate',
+          'heuristicViolations', 'successorSeconds', 'searchSeconds']
+
+
+class InstrumentedProblem:
+    """
+    Wraps a search problem, counting and timing getSuccessors and
+    getPredecessors calls and counting goal tests.  Every other attribute is
+    read from the wrapped problem, so heuristics see the problem as usual,
+    and the display counters in FORWARDED are written to it as well, so
+    searches that update them directly (jumpPointSearch does
+    problem._expanded += 1) are not hidden by the wrapper.
+    """
+    FORWARDED = ('_expanded', '_visited', '_visitedlist')
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.expanded = 0
+        self.generated = 0
+        self.goalTests = 0
+        # The distinct goal states found; a search may test a goal more than once
+        self.goalsFound = set()
+        self.successorSeconds = 0.0
+
+    def getStartState(self):
+        return self.problem.getStartState()
+
+    def isGoalState(self, state):
+        self.goalTests += 1
+        isGoal = self.problem.isGoalState(state)
+        if isGoal: self.goalsFound.add(state)
+        return isGoal
+
+    def getSuccessors(self, state):
+        return self._expand(self.problem.getSuccessors, state)
+
+    def getPredecessors(self, state):
+        return self._expand(self.problem.getPredecessors, state)
+
+    def getCostOfActions(self, actions):
+        return self.problem.getCostOfActions(actions)
+
+    def _expand(self, function, state):
+        start = time.perf_counter()
+        successors = function(state)
+        self.successorSeconds += time.perf_counter() - start
+        self.expanded += 1
+        self.generated += len(successors)
+        return successors
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def __setattr__(self, name, value):
+        if name in self.FORWARDED: setattr(self.problem, name, value)
+        else: object.__setattr__(self, name, value)
+
+    def __dir__(self):
+        return sorted(set(object.__dir__(self)) | set(dir(self.problem)))
+
+
+class _Recorder:
+    """
+    The running totals of one recorded search.  Fringes created while the
+    heuristic is running (a heuristic may run searches of its own) are not
+    tracked.
+    """
+    current = None
+
+    def __init__(self):
+        self.fringes = []
+        self.pops = 0
+        self.size = 0
+        self.peakFringe = 0
+        self.heuristicCalls = 0
+        self.heuristicSeconds = 0.0
+        self.inHeuristic = False
+
+    def track(self, fringe):
+        if self.inHeuristic: return False
+        self.fringes.append(fringe)
+        return True
+
+    def resized(self, fringe, size):
+        self.size += size - fringe._trackedSize
+        fringe._trackedSize = size
+        if self.size > self.peakFringe: self.peakFringe = self.size
+
+    def instrument(self, heuristic):
+        "Returns heuristic, wrapped to count and time its calls on the unwrapped problem."
+        def instrumented(state, problem=None):
+            self.heuristicCalls += 1
+            self.inHeuristic = True
+            if isinstance(problem, InstrumentedProblem): problem = problem.problem
+            start = time.perf_counter()
+            try:
+                return heuristic(state, problem)
+            finally:
+                self.heuristicSeconds += time.perf_counter() - start
+                self.inHeuristic = False
+        return instrumented
+
+class _TrackedFringe:
+    "Mixin for the util containers which reports to the current _Recorder."
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        recorder = _Recorder.current
+        self._recorder = recorder if recorder != None and recorder.track(self) else None
+        self._trackedSize = 0
+
+    def push(self, *args):
+        super().push(*args)
+        if self._recorder != None: self._recorder.resized(self, len(self))
+
+    def extend(self, items):
+        super().extend(items)
+        if self._recorder != None: self._recorder.resized(self, len(self))
+
+    def pop(self):
+        item = super().pop()
+        if self._recorder != None:
+            self._recorder.pops += 1
+            self._recorder.resized(self, len(self))
+        return item
+
+class _TrackedStack(_TrackedFringe, util.Stack): pass
+class _TrackedQueue(_TrackedFringe, util.Queue): pass
+class _TrackedPriorityQueue(_TrackedFringe, util.PriorityQueue): pass
+class _TrackedPriorityQueueWithFunction(_TrackedFringe, util.PriorityQueueWithFunction): pass
+class _TrackedIndexedPriorityQueue(_TrackedFringe, util.IndexedPriorityQueue): pass
+
+_TRACKED = {
+    'Stack': _TrackedStack,
+    'Queue': _TrackedQueue,
+    'PriorityQueue': _TrackedPriorityQueue,
+    'PriorityQueueWithFunction': _TrackedPriorityQueueWithFunction,
+    'IndexedPriorityQueue': _TrackedIndexedPriorityQueue,
+}
+
+
+def recordSearch(function, problem, heuristic=None, layout=None, **searchArgs):
+    """
+    Runs function(problem) (with the heuristic and any searchArgs as keyword
+    arguments) and returns (actions, record).  layout is only copied into the
+    record, to label it.
+    """
+    if _Recorder.current != None: raise Exception('recordSearch cannot be nested')
+    recorder = _Recorder()
+    cached = heuristic if isinstance(heuristic, search.CachedHeuristic) else None
+    instrumented = InstrumentedProblem(problem)
+    startExpanded = getattr(problem, '_expanded', None)
+    if heuristic != None:
+        searchArgs['heuristic'] = recorder.instrument(heuristic)
+
+    originals = dict((name, getattr(util, name)) for name in _TRACKED)
+    for name, tracked in _TRACKED.items():
+        setattr(util, name, tracked)
+    _Recorder.current = recorder
+    try:
+        start = time.perf_counter()
+        actions = function(instrumented, **searchArgs)
+        searchSeconds = time.perf_counter() - start
+    finally:
+        _Recorder.current = None
+        for name, original in originals.items():
+            setattr(util, name, original)
+
+    expanded = instrumented.expanded
+    if expanded == 0 and startExpanded != None:
+        # jumpPointSearch expands without calling getSuccessors
+        expanded = problem._expanded - startExpanded
+
+    record = dict.fromkeys(FIELDS)
+    record.update(layout=layout, function=function.__name__, problem=type(problem).__name__,
+                  heuristic=heuristic.__name__ if heuristic != None else None,
+                  expanded=expanded, generated=instrumented.generated,
+                  goalTests=instrumented.goalTests,
+                  successorSeconds=instrumented.successorSeconds, searchSeconds=searchSeconds)
+    if actions != None:
+        record.update(cost=problem.getCostOfActions(actions), pathLength=len(actions))
+    if heuristic != None:
+        record.update(heuristicCalls=recorder.heuristicCalls, heuristicSeconds=recorder.heuristicSeconds)
+    if recorder.fringes:
+        pushes = recorder.pops + sum(len(fringe) for fringe in recorder.fringes)
+        # Every pop is either expanded, a goal, or a state already expanded
+        duplicates = max(0, recorder.pops - expanded - len(instrumented.goalsFound))
+        record.update(pushes=pushes, pops=recorder.pops, duplicates=duplicates,
+                      peakFringe=recorder.peakFringe)
+    else:
+        # IDA* and SMA* leave their peak memory on the (wrapped) problem
+        record.update(peakFringe=getattr(instrumented, '_peakNodes', None))
+    if cached != None:
+        record['heuristicHitRate'] = cached.hitRate()
+        if cached.check:
+            cached.checkPlan(problem, actions)
+            record['heuristicViolations'] = len(cached.violations)
+    return actions, record
+
+def writeJSON(records, path):
+    "Writes a list of records to path as a JSON array."
+    with open(path, 'w') as f:
+        json.dump(records, f, indent=2)
+        f.write('\n')
+
+def writeCSV(records, path):
+    "Writes a list of records to path as CSV, one row per record."
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def testRecordJumpPoint():
+    """
+    Checks that a record of jumpPointSearch, which counts its expansions in
+    problem._expanded instead of calling getSuccessors, counts them and no
+    duplicates.
+    """
+    import searchAgents
+    from benchmarks import loadGameState
+    for name in ['tinyMaze', 'mediumMaze', 'bigMaze', 'openMaze']:
+        plain = searchAgents.PositionSearchProblem(loadGameState(name), warn=False, visualize=False)
+        search.jumpPointSearch(plain, searchAgents.manhattanHeuristic)
+        problem = searchAgents.PositionSearchProblem(loadGameState(name), warn=False, visualize=False)
+        actions, record = recordSearch(search.jumpPointSearch, problem, searchAgents.manhattanHeuristic, layout=name)
+        assert record['expanded'] == plain._expanded == problem._expanded > 0, (name, record)
+        assert len(problem._visitedlist) == len(plain._visitedlist), name
+        # Every state but the goal is expanded when it is first popped
+        assert record['duplicates'] == record['pops'] - record['expanded'] - 1, (name, record)
+        print('%s: %d expanded, %d duplicates' % (name, record['expanded'], record['duplicates']))
+
+def readCommand(argv):
+    "Processes the command used to collect search records."
+    from optparse import OptionParser
+    usageStr = """
+    USAGE:      python searchStats.py <options>
+    EXAMPLES:   (1) python searchStats.py -l tinyMaze,mediumMaze -f bfs
+                    - prints a record for BFS on each layout
+                (2) python searchStats.py -l trickySearch -f astar -p FoodSearchProblem -H foodHeuristic -o stats.json
+                    - writes the record for A* with foodHeuristic to stats.json
+                (3) python searchStats.py -l trickySearch -f astar -p FoodSearchProblem -H foodHeuristic --cache 50000 --check
+                    - caches foodHeuristic and checks it is consistent and admissible
+    """
+    parser = OptionParser(usageStr)
+    parser.add_option('-l', '--layouts', dest='layouts', default='mediumMaze',
+                      help='comma-separated layouts to search')
+    parser.add_option('-f', '--function', dest='function', default='bfs',
+                      help='the search function in search.py')
+    parser.add_option('-p', '--problem', dest='problem', default='PositionSearchProblem',
+                      help='the search problem type in searchAgents.py')
+    parser.add_option('-H', '--heuristic', dest='heuristic', default=None,
+                      help='the heuristic in searchAgents.py or search.py, if the function takes one')
+    parser.add_option('--cache', dest='cache', type='int', default=None,
+                      help='cache up to this many heuristic values (see search.CachedHeuristic)')
+    parser.add_option('--check', dest='check', action='store_true', default=False,
+                      help='cache the heuristic and check it for consistency and admissibility')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='write the records to this .json or .csv file instead of printing them')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+def runCommand(options):
+    import searchAgents
+    from benchmarks import loadGameState, printTable
+
+    function = getattr(search, options.function)
+    problemType = getattr(searchAgents, options.problem)
+    heuristic = None
+    if options.heuristic != None:
+        heuristic = getattr(searchAgents, options.heuristic, None) or getattr(search, options.heuristic)
+
+    records = []
+    for name in options.layouts.split(','):
+        problem = problemType(loadGameState(name))
+        if heuristic != None and (options.cache != None or options.check):
+            cached = search.CachedHeuristic(heuristic, options.cache or 100000, options.check)
+            records.append(recordSearch(function, problem, cached, layout=name)[1])
+        else:
+            records.append(recordSearch(function, problem, heuristic, layout=name)[1])
+
+    if options.output == None:
+        printTable(FIELDS, [[('%.4f' % value if isinstance(value, float) else value) for value in
+                             [record[field] for field in FIELDS]] for record in records])
+    elif options.output.endswith('.csv'):
+        writeCSV(records, options.output)
+    else:
+        writeJSON(records, options.output)
+
+if __name__ == '__main__':
+    import sys
+    runCommand(readCommand(sys.argv[1:]))
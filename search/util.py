@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq, random
+from collections import deque
 try:
     from StringIO import StringIO ## for Python 2
 except ImportError:
@@ -134,7 +135,29 @@ class FixedRandom:
  Data structures useful for implementing SearchAgents
 """
 
-class Stack:
+class Container:
+    """
+      The protocol shared by the containers below.  Every container supports
+      push, pop and peek, len(), truth testing (an empty container is false,
+      so 'while fringe:' works) and extend, which pushes a whole batch of
+      items in one call.
+    """
+    def __len__(self):
+        return len(self.list)
+
+    def __bool__(self):
+        return len(self) != 0
+
+    def isEmpty(self):
+        "Returns true if the container is empty"
+        return len(self) == 0
+
+    def extend(self, items):
+        "Push every item in 'items', in order"
+        for item in items:
+            self.push(item)
+
+class Stack(Container):
     "A container with a last-in-first-out (LIFO) queuing policy."
     def __init__(self):
         self.list = []
@@ -143,35 +166,43 @@ class Stack:
         "Push 'item' onto the stack"
         self.list.append(item)
 
+    def extend(self, items):
+        "Push every item in 'items'; the last one ends up on top"
+        self.list.extend(items)
+
     def pop(self):
         "Pop the most recently pushed item from the stack"
         return self.list.pop()
 
-    def isEmpty(self):
-        "Returns true if the stack is empty"
-        return len(self.list) == 0
+    def peek(self):
+        "Returns the item pop would return, without removing it"
+        return self.list[-1]
 
-class Queue:
+class Queue(Container):
     "A container with a first-in-first-out (FIFO) queuing policy."
     def __init__(self):
-        self.list = []
+        self.list = deque()
 
     def push(self,item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0,item)
+        self.list.append(item)
+
+    def extend(self, items):
+        "Enqueue every item in 'items', in order"
+        self.list.extend(items)
 
     def pop(self):
         """
           Dequeue the earliest enqueued item still in the queue. This
           operation removes the item from the queue.
         """
-        return self.list.pop()
+        return self.list.popleft()
 
-    def isEmpty(self):
-        "Returns true if the queue is empty"
-        return len(self.list) == 0
+    def peek(self):
+        "Returns the item pop would return, without removing it"
+        return self.list[0]
 
-class PriorityQueue:
+class PriorityQueue(Container):
     """
       Implements a priority queue data structure. Each inserted item
       has a priority associated with it and the client is usually interested
@@ -191,8 +222,17 @@ class PriorityQueue:
         (_, _, item) = heapq.heappop(self.heap)
         return item
 
-    def isEmpty(self):
-        return len(self.heap) == 0
+    def __len__(self):
+        return len(self.heap)
+
+    def peek(self):
+        "Returns the item pop would return, without removing it"
+        return self.heap[0][2]
+
+    def extend(self, entries):
+        "Push every (item, priority) pair in 'entries'"
+        for item, priority in entries:
+            self.push(item, priority)
 
     def update(self, item, priority):
         # If item already in priority queue with higher priority, update its priority and rebuild the heap.
@@ -225,6 +265,109 @@ class PriorityQueueWithFunction(PriorityQueue):
         "Adds an item to the queue with priority from the priority function"
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
+    def extend(self, items):
+        "Push every item in 'items' with priority from the priority function"
+        Container.extend(self, items)
+
+
+class IndexedPriorityQueue(PriorityQueue):
+    """
+      Implements a priority queue that holds at most one entry per item.
+
+      A position map from each item to its index in the binary heap lets
+      update() and decreaseKey() change the priority of a queued item in
+      O(log n), instead of scanning the whole heap or leaving a stale
+      duplicate behind.  Items must be hashable.  Ties are broken in
+      insertion order, and an item whose priority is lowered counts as
+      inserted at that moment, exactly as if it had been pushed again.
+    """
+    def  __init__(self):
+        self.heap = []
+        self.index = {}
+        self.count = 0
+
+    def push(self, item, priority):
+        "Adds an item that is not already in the queue"
+        entry = [priority, self.count, item]
+        self.count += 1
+        self.index[item] = len(self.heap)
+        self.heap.append(entry)
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        "Removes and returns the item with the lowest priority"
+        heap = self.heap
+        last = heap.pop()
+        if heap:
+            entry = heap[0]
+            heap[0] = last
+            self.index[last[2]] = 0
+            self._siftDown(0)
+        else:
+            entry = last
+        del self.index[entry[2]]
+        return entry[2]
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def getPriority(self, item):
+        "Returns the current priority of a queued item"
+        return self.heap[self.index[item]][0]
+
+    def decreaseKey(self, item, priority):
+        """
+          Lowers the priority of an item already in the queue.  A priority
+          that is not lower than the current one is ignored.
+        """
+        position = self.index[item]
+        entry = self.heap[position]
+        if priority < entry[0]:
+            entry[0] = priority
+            entry[1] = self.count
+            self.count += 1
+            self._siftUp(position)
+
+    def update(self, item, priority):
+        # If item already in priority queue with higher priority, lower its priority.
+        # If item already in priority queue with equal or lower priority, do nothing.
+        # If item not in priority queue, do the same thing as self.push.
+        if item in self.index:
+            self.decreaseKey(item, priority)
+        else:
+            self.push(item, priority)
+
+    def _siftUp(self, position):
+        heap, index = self.heap, self.index
+        entry = heap[position]
+        while position > 0:
+            parentPosition = (position - 1) >> 1
+            parent = heap[parentPosition]
+            if not entry < parent:
+                break
+            heap[position] = parent
+            index[parent[2]] = position
+            position = parentPosition
+        heap[position] = entry
+        index[entry[2]] = position
+
+    def _siftDown(self, position):
+        heap, index = self.heap, self.index
+        size = len(heap)
+        entry = heap[position]
+        child = 2 * position + 1
+        while child < size:
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < entry:
+                break
+            heap[position] = heap[child]
+            index[heap[child][2]] = position
+            position = child
+            child = 2 * position + 1
+        heap[position] = entry
+        index[entry[2]] = position
+
 
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"